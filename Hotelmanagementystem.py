@@ -1,50 +1,47 @@
+from startup import timer
+import argparse
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import sqlite3
-import datetime  # For handling dates
-
-# Database setup
-conn = sqlite3.connect('hotel.db')
-c = conn.cursor()
-
-# Create tables if they don't exist
-c.execute('''CREATE TABLE IF NOT EXISTS rooms (
-    room_number INTEGER PRIMARY KEY,
-    room_type TEXT,
-    price REAL,
-    is_available INTEGER DEFAULT 1  -- 1 for available, 0 for occupied
-)''')
-
-c.execute('''CREATE TABLE IF NOT EXISTS guests (
-    guest_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT,
-    phone TEXT,
-    email TEXT
-)''')
-
-c.execute('''CREATE TABLE IF NOT EXISTS bookings (
-    booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
-    room_number INTEGER,
-    guest_id INTEGER,
-    check_in_date TEXT,
-    check_out_date TEXT,
-    FOREIGN KEY (room_number) REFERENCES rooms(room_number),
-    FOREIGN KEY (guest_id) REFERENCES guests(guest_id)
-)''')
-
-conn.commit()
-
+from paged_view import KeysetSource, ListSource, PagedTreeview
+from tasks import FrameMonitor, TaskRunner
+from exporter import EXPORT_FILETYPES
+from availability import validate_stay
+from hotel_import import parse_room_numbers
+from dashboard import AnalyticsWindow
+from diagnostics import DiagnosticsWindow
+from instrumentation import install, log_error, setup_log
+import hotel_data
+
+timer.mark("imports")
 
 class HotelManagementApp:
-    def __init__(self, root):
+    def __init__(self, root, backend=None):
+        # backend is hotel_data (local hotel.db) or an api_client.HotelClient with the same functions
+        self.backend = backend or hotel_data
         self.root = root
         self.root.title("Modern Hotel Management System")
         self.root.geometry("1000x700")  # Increased size
         self.style = ttk.Style()
+        self.diagnostics = None
+        self.analytics = None
+        self.tasks = TaskRunner(root)  # Database work runs off the Tk thread
+        self.frames = FrameMonitor(root)  # frame latency of the Tk loop, see frames.stats()
+        self.frames.start()
+        # Schema setup is queued on the db worker ahead of the first page loads
+        self.tasks.submit(self.backend.init_db, on_done=lambda _: timer.mark("schema"))
         self.configure_style()
         self.create_widgets()
+        self._pending_loads = 2
+        self.room_pager.on_load = self.booking_pager.on_load = self.first_load_done
         self.load_rooms()  # Load rooms on startup
         self.load_bookings() # Load bookings on startup
+        self.root.after_idle(timer.mark, "window shown")
+
+    def first_load_done(self, rows):
+        self._pending_loads -= 1
+        if self._pending_loads <= 0:
+            timer.finish()
 
     def configure_style(self):
         # Configure the style for a modern look
@@ -103,6 +100,9 @@ class HotelManagementApp:
 
         ttk.Button(room_frame, text="Add Room", command=self.add_room).grid(row=0, column=6, padx=10, pady=5, sticky="w")
         ttk.Button(room_frame, text="Delete Room", command=self.delete_room).grid(row=0, column=7, padx=10, pady=5, sticky="w")
+        ttk.Button(room_frame, text="Export Rooms", command=lambda: self.export_table("rooms")).grid(row=0, column=8, padx=10, pady=5, sticky="w")
+        ttk.Button(room_frame, text="Import Rooms", command=self.import_rooms).grid(row=0, column=9, padx=10, pady=5, sticky="w")
+        ttk.Button(room_frame, text="Analytics", command=self.show_analytics).grid(row=0, column=10, padx=10, pady=5, sticky="w")
 
         # --- Guest Management Frame ---
         guest_frame = ttk.LabelFrame(self.root, text="Guest Management")
@@ -144,6 +144,17 @@ class HotelManagementApp:
 
         ttk.Button(booking_frame, text="Create Booking", command=self.create_booking).grid(row=0, column=8, padx=10, pady=5, sticky="w")
         ttk.Button(booking_frame, text="Delete Booking", command=self.delete_booking).grid(row=0, column=9, padx=10, pady=5, sticky="w")
+        ttk.Button(booking_frame, text="Export Bookings", command=lambda: self.export_table("bookings")).grid(row=1, column=7, padx=10, pady=5, sticky="w")
+        ttk.Button(booking_frame, text="Find Free Rooms", command=self.find_free_rooms).grid(row=1, column=8, padx=10, pady=5, sticky="w")
+        ttk.Button(booking_frame, text="Show All Rooms", command=self.load_rooms).grid(row=1, column=9, padx=10, pady=5, sticky="w")
+
+        # Group bookings: the guest and dates above over a list of rooms, e.g. 101-105, 110
+        ttk.Label(booking_frame, text="Group Rooms").grid(row=1, column=0, padx=5, pady=5, sticky="e")
+        self.group_rooms_var = tk.StringVar()
+        ttk.Entry(booking_frame, textvariable=self.group_rooms_var, width=15).grid(row=1, column=1, columnspan=2, padx=5, sticky="w")
+        ttk.Button(booking_frame, text="Book Group", command=self.create_group_booking).grid(row=1, column=3, padx=5, pady=5, sticky="w")
+        ttk.Button(booking_frame, text="Check Out Selected", command=self.check_out_selected).grid(row=1, column=4, columnspan=2, padx=5, pady=5, sticky="w")
+        ttk.Button(booking_frame, text="Diagnostics", command=self.show_diagnostics).grid(row=1, column=6, padx=5, pady=5, sticky="e")
 
 
         # --- Room List Frame ---
@@ -155,7 +166,10 @@ class HotelManagementApp:
         for col in room_columns:
             self.room_tree.heading(col, text=col.replace("_", " ").title())
             self.room_tree.column(col, anchor="center")
+        room_scrollbar = ttk.Scrollbar(room_list_frame, orient="vertical")
+        room_scrollbar.pack(side="right", fill="y")
         self.room_tree.pack(fill="both", expand=True)
+        self.room_pager = PagedTreeview(self.room_tree, KeysetSource(self.backend.fetch_rooms_page), room_scrollbar, runner=self.tasks)
 
         # --- Booking List Frame ---
         booking_list_frame = ttk.LabelFrame(self.root, text="Booking List")
@@ -166,8 +180,31 @@ class HotelManagementApp:
         for col in booking_columns:
             self.booking_tree.heading(col, text=col.replace("_", " ").title())
             self.booking_tree.column(col, anchor="center")
+        booking_scrollbar = ttk.Scrollbar(booking_list_frame, orient="vertical")
+        booking_scrollbar.pack(side="right", fill="y")
         self.booking_tree.pack(fill="both", expand=True)
+        self.booking_pager = PagedTreeview(self.booking_tree, KeysetSource(self.backend.fetch_bookings_page), booking_scrollbar, runner=self.tasks)
+
 
+    def show_error(self, e):
+        if isinstance(e, ValueError):
+            self.tasks.notify(messagebox.showerror, "Error", str(e))
+        else:
+            log_error(e, "hotel")
+            self.tasks.notify(messagebox.showerror, "Error", f"An unexpected error occurred: {e}")
+
+    def show_analytics(self):
+        if self.analytics is not None and self.analytics.exists():
+            self.analytics.lift()
+            self.analytics.refresh()
+        else:
+            self.analytics = AnalyticsWindow(self.root, self.tasks, self.backend.occupancy_report)
+
+    def show_diagnostics(self):
+        if self.diagnostics is not None and self.diagnostics.exists():
+            self.diagnostics.lift()
+        else:
+            self.diagnostics = DiagnosticsWindow(self.root, self.frames, getattr(self.backend, "cache_stats", None))
 
     # --- Room Management Functions ---
     def add_room(self):
@@ -179,15 +216,18 @@ class HotelManagementApp:
             if not all([room_number, room_type, price]):
                 raise ValueError("Please fill all room details.")
 
-            c.execute("INSERT INTO rooms (room_number, room_type, price) VALUES (?, ?, ?)",
-                      (room_number, room_type, price))
-            conn.commit()
-            self.load_rooms()
-            messagebox.showinfo("Success", "Room added successfully!")
+            def done(room):
+                self.room_pager.upsert(room)
+                self.tasks.notify(messagebox.showinfo, "Success", "Room added successfully!")
+            def failed(e):
+                if isinstance(e, sqlite3.IntegrityError):
+                    self.tasks.notify(messagebox.showerror, "Error", "Room number already exists.")
+                else:
+                    self.show_error(e)
+            self.tasks.submit(self.backend.insert_room, room_number, room_type, price, on_done=done, on_error=failed,
+                              span="ui add_room")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", "Room number already exists.")
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
 
@@ -197,27 +237,41 @@ class HotelManagementApp:
             if not room_number:
                 raise ValueError("Please enter a room number to delete.")
 
-            # Check if the room is currently booked
-            c.execute("SELECT * FROM bookings WHERE room_number = ?", (room_number,))
-            if c.fetchone():
-                messagebox.showerror("Error", "Cannot delete room. It is currently booked.")
-                return
-
-            c.execute("DELETE FROM rooms WHERE room_number = ?", (room_number,))
-            conn.commit()
-            self.load_rooms()
-            messagebox.showinfo("Success", "Room deleted successfully!")
+            def done(deleted):
+                self.room_pager.remove(deleted)
+                self.tasks.notify(messagebox.showinfo, "Success", "Room deleted successfully!")
+            self.tasks.submit(self.backend.remove_room, room_number, on_done=done, on_error=self.show_error,
+                              span="ui delete_room")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
 
+    def import_rooms(self):
+        # The whole file is added in one transaction, or nothing if any row is bad or already exists
+        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        if file_path:
+            def done(rooms):
+                self.load_rooms()
+                self.tasks.notify(messagebox.showinfo, "Imported", f"{len(rooms)} rooms added.")
+            self.tasks.submit_with_dialog("Import", "Importing rooms...", self.backend.import_rooms_job, file_path,
+                                          on_done=done, on_error=self.show_error, span="ui import_rooms")
+
     def load_rooms(self):
-        for row in self.room_tree.get_children():
-            self.room_tree.delete(row)
-        c.execute("SELECT * FROM rooms")
-        for room in c.fetchall():
-            self.room_tree.insert("", "end", values=room)
+        self.room_pager.set_source(KeysetSource(self.backend.fetch_rooms_page))
+
+    def find_free_rooms(self):
+        # Rooms of the type selected under Room Management (any type if empty) free for the booking dates
+        self.tasks.submit(self.backend.find_free_rooms, self.check_in_date_var.get(), self.check_out_date_var.get(),
+                          self.room_type_var.get() or None, on_error=self.show_error,
+                          on_done=lambda rooms: self.room_pager.set_source(ListSource(rooms)), span="ui find_free_rooms")
+
+    def export_table(self, table):
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=EXPORT_FILETYPES)
+        if file_path:
+            self.tasks.submit_with_dialog("Export", f"Exporting {table}...", self.backend.export_table, table, file_path,
+                                          on_done=lambda count: self.tasks.notify(messagebox.showinfo, "Exported", f"{count} {table} exported to {file_path}"),
+                                          on_error=self.show_error)
 
     # --- Guest Management Functions ---
     def add_guest(self):
@@ -229,10 +283,9 @@ class HotelManagementApp:
             if not all([name, phone, email]):
                 raise ValueError("Please fill all guest details.")
 
-            c.execute("INSERT INTO guests (name, phone, email) VALUES (?, ?, ?)",
-                      (name, phone, email))
-            conn.commit()
-            messagebox.showinfo("Success", "Guest added successfully! Note the Guest ID for bookings.")
+            self.tasks.submit(self.backend.insert_guest, name, phone, email, on_error=self.show_error, span="ui add_guest",
+                              on_done=lambda guest: self.tasks.notify(
+                                  messagebox.showinfo, "Success", f"Guest added successfully! Guest ID for bookings: {guest[0]}"))
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except Exception as e:
@@ -249,35 +302,16 @@ class HotelManagementApp:
             if not all([room_number, guest_id, check_in_date, check_out_date]):
                 raise ValueError("Please fill all booking details.")
 
-            # Validate date format (YYYY-MM-DD)
-            try:
-                datetime.datetime.strptime(check_in_date, '%Y-%m-%d')
-                datetime.datetime.strptime(check_out_date, '%Y-%m-%d')
-            except ValueError:
-                raise ValueError("Incorrect date format, should be YYYY-MM-DD")
-
-            # Check if the room is available
-            c.execute("SELECT is_available FROM rooms WHERE room_number = ?", (room_number,))
-            result = c.fetchone()
-            if not result or result[0] == 0:
-                raise ValueError("Room is not available.")
-
-            # Check if the guest exists
-            c.execute("SELECT * FROM guests WHERE guest_id = ?", (guest_id,))
-            if not c.fetchone():
-                raise ValueError("Guest ID not found.")
-
-            # Create the booking
-            c.execute("INSERT INTO bookings (room_number, guest_id, check_in_date, check_out_date) VALUES (?, ?, ?, ?)",
-                      (room_number, guest_id, check_in_date, check_out_date))
-
-            # Update room availability
-            c.execute("UPDATE rooms SET is_available = 0 WHERE room_number = ?", (room_number,))
-
-            conn.commit()
-            self.load_rooms()  # Refresh room list
-            self.load_bookings() # Refresh booking list
-            messagebox.showinfo("Success", "Booking created successfully!")
+            # Validate date format (YYYY-MM-DD) and order
+            validate_stay(check_in_date, check_out_date)
+
+            def done(result):
+                booking, room = result
+                self.room_pager.upsert(room)  # Update the changed rows in place
+                self.booking_pager.upsert(booking)
+                self.tasks.notify(messagebox.showinfo, "Success", "Booking created successfully!")
+            self.tasks.submit(self.backend.book_room, room_number, guest_id, check_in_date, check_out_date,
+                              on_done=done, on_error=self.show_error, span="ui create_booking")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except Exception as e:
@@ -293,31 +327,86 @@ class HotelManagementApp:
             if not all([room_number, guest_id, check_in_date, check_out_date]):
                 raise ValueError("Please fill all booking details to delete.")
 
-            # Delete the booking
-            c.execute("DELETE FROM bookings WHERE room_number = ? AND guest_id = ? AND check_in_date = ? AND check_out_date = ?",
-                      (room_number, guest_id, check_in_date, check_out_date))
-
-            # Update room availability
-            c.execute("UPDATE rooms SET is_available = 1 WHERE room_number = ?", (room_number,))
+            def done(result):
+                booking_ids, room = result
+                if room:
+                    self.room_pager.upsert(room)  # Update the changed rows in place
+                if not booking_ids:
+                    self.tasks.notify(messagebox.showinfo, "Not found", "No matching booking to delete.")
+                    return
+                for booking_id in booking_ids:
+                    self.booking_pager.remove(booking_id)
+                self.tasks.notify(messagebox.showinfo, "Success", "Booking deleted successfully!")
+            self.tasks.submit(self.backend.cancel_booking, room_number, guest_id, check_in_date, check_out_date,
+                              on_done=done, on_error=self.show_error, span="ui delete_booking")
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+        except Exception as e:
+            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
 
-            conn.commit()
-            self.load_rooms()  # Refresh room list
-            self.load_bookings() # Refresh booking list
-            messagebox.showinfo("Success", "Booking deleted successfully!")
+    def create_group_booking(self):
+        try:
+            room_numbers = parse_room_numbers(self.group_rooms_var.get())
+            guest_id = self.booking_guest_id_var.get()
+            check_in_date = self.check_in_date_var.get()
+            check_out_date = self.check_out_date_var.get()
+            if not all([guest_id, check_in_date, check_out_date]):
+                raise ValueError("Please fill the guest ID and dates for the group booking.")
+            validate_stay(check_in_date, check_out_date)
+
+            def done(result):
+                bookings, rooms = result
+                # One refresh for the whole group rather than one per booking
+                self.load_rooms()
+                self.load_bookings()
+                self.tasks.notify(messagebox.showinfo, "Success", f"{len(bookings)} bookings created.")
+            self.tasks.submit(self.backend.book_rooms,
+                              [(room, guest_id, check_in_date, check_out_date) for room in room_numbers],
+                              on_done=done, on_error=self.show_error, span="ui create_group_booking")
         except ValueError as e:
             messagebox.showerror("Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
 
+    def check_out_selected(self):
+        # Ends the selected stays today; select several bookings with Ctrl/Shift-click
+        booking_ids = [int(iid) for iid in self.booking_tree.selection()]
+        if not booking_ids:
+            messagebox.showerror("Error", "Please select the bookings to check out.")
+            return
+
+        def done(result):
+            bookings, rooms = result
+            self.load_rooms()
+            for booking in bookings:
+                self.booking_pager.upsert(booking)  # selected, so on screen: updated in place
+            self.tasks.notify(messagebox.showinfo, "Success", f"{len(bookings)} bookings checked out.")
+        self.tasks.submit(self.backend.check_out, booking_ids, on_done=done, on_error=self.show_error,
+                          span="ui check_out_selected")
+
     def load_bookings(self):
-        for row in self.booking_tree.get_children():
-            self.booking_tree.delete(row)
-        c.execute("SELECT * FROM bookings")
-        for booking in c.fetchall():
-            self.booking_tree.insert("", "end", values=booking)
+        self.booking_pager.reload()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Modern Hotel Management System")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--server", help="use a shared api_server.py backend, e.g. http://127.0.0.1:8080")
+    source.add_argument("--properties", help="one database per property, listed in this file (see shards.py)")
+    parser.add_argument("--startup-report", action="store_true", help="print startup timings")
+    args = parser.parse_args()
+    timer.enable(args.startup_report)
+
+    backend = None
+    if args.server:
+        from api_client import HotelClient
+        backend = HotelClient(args.server)
+    elif args.properties:
+        from shards import ShardedHotel
+        backend = ShardedHotel(args.properties)
+    else:
+        install(hotel_data.hotel_db)
+    setup_log()
     root = tk.Tk()
-    app = HotelManagementApp(root)
+    app = HotelManagementApp(root, backend)
     root.mainloop()
@@ -0,0 +1,209 @@
+import argparse
+import datetime
+import sqlite3
+
+# ---------- Occupancy and revenue analytics ----------
+# daily_stats holds, per night and room type, the room-nights sold and their
+# revenue. Every booking write updates it in the same transaction
+# (record_stays), so a report over any date range reads at most
+# days x room types rows through the primary key instead of scanning
+# bookings. Revenue is the room's price per night; rooms keep their price for
+# as long as they have bookings (remove_room refuses booked rooms).
+#
+#   python analytics.py --from 2024-01-01 --to 2024-12-31
+#   python analytics.py --rebuild      # recompute from bookings, e.g. after a bulk load
+#
+# NumPy, when installed, turns the daily rows into dense arrays in one pass;
+# without it the same series are built with plain lists.
+
+DAILY_STATS_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS daily_stats (
+        day TEXT NOT NULL,
+        room_type TEXT NOT NULL,
+        room_nights INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, room_type)
+    ) WITHOUT ROWID""",
+]
+
+UPSERT_SQL = """
+    INSERT INTO daily_stats (day, room_type, room_nights, revenue) VALUES (?, ?, ?, ?)
+    ON CONFLICT (day, room_type) DO UPDATE SET
+        room_nights = room_nights + excluded.room_nights,
+        revenue = revenue + excluded.revenue
+"""
+
+RANGE_SQL = """
+    SELECT room_type, SUM(room_nights), SUM(revenue) FROM daily_stats
+     WHERE day >= ? AND day < ? {type_filter}
+     GROUP BY room_type
+"""
+
+DAILY_SQL = """
+    SELECT day, SUM(room_nights), SUM(revenue) FROM daily_stats
+     WHERE day >= ? AND day < ? {type_filter}
+     GROUP BY day
+"""
+
+
+def nights(check_in_date, check_out_date):
+    day = datetime.date.fromisoformat(check_in_date)
+    end = datetime.date.fromisoformat(check_out_date)
+    while day < end:
+        yield day.isoformat()
+        day += datetime.timedelta(days=1)
+
+
+def room_nights(stays, rooms):
+    """{(day, room_type): [nights, revenue]} for (room_number, check_in, check_out) stays."""
+    totals = {}
+    for room_number, check_in_date, check_out_date in stays:
+        room_type, price = rooms[room_number]
+        for day in nights(check_in_date, check_out_date):
+            entry = totals.setdefault((day, room_type), [0, 0.0])
+            entry[0] += 1
+            entry[1] += price
+    return totals
+
+
+def record_stays(conn, stays, sign=1):
+    """Add (sign=1) or remove (sign=-1) the nights of these stays; runs inside the booking transaction."""
+    stays = list(stays)
+    if not stays:
+        return
+    rooms = {}
+    for room_number in {stay[0] for stay in stays}:
+        row = conn.execute("SELECT room_type, price FROM rooms WHERE room_number = ?", (room_number,)).fetchone()
+        rooms[room_number] = (row[0] or "", row[1] or 0.0)
+    totals = room_nights(stays, rooms)
+    conn.executemany(UPSERT_SQL, [(day, room_type, sign * count, sign * revenue)
+                                  for (day, room_type), (count, revenue) in totals.items()])
+    if sign < 0:  # nights nobody stays any more, as rebuild_daily_stats would leave them
+        conn.executemany("DELETE FROM daily_stats WHERE day = ? AND room_type = ? AND room_nights <= 0", list(totals))
+
+
+def rebuild_daily_stats(conn):
+    """Recompute daily_stats from every booking; returns the number of rows written."""
+    rooms = {number: (room_type or "", price or 0.0)
+             for number, room_type, price in conn.execute("SELECT room_number, room_type, price FROM rooms")}
+    # Bookings of rooms that no longer exist have no price and are left out
+    stays = ((room, check_in, check_out) for room, check_in, check_out in
+             conn.execute("SELECT room_number, check_in_date, check_out_date FROM bookings") if room in rooms)
+    totals = room_nights(stays, rooms)
+    conn.execute("DELETE FROM daily_stats")
+    conn.executemany(UPSERT_SQL, [(day, room_type, count, revenue) for (day, room_type), (count, revenue) in totals.items()])
+    return len(totals)
+
+
+def parse_range(start, end):
+    """Inclusive 'YYYY-MM-DD' dates -> (start, day after end) as dates."""
+    try:
+        first = datetime.date.fromisoformat(str(start).strip())
+        last = datetime.date.fromisoformat(str(end).strip())
+    except ValueError:
+        raise ValueError("Incorrect date format, should be YYYY-MM-DD")
+    if last < first:
+        raise ValueError("The end date must not be before the start date.")
+    return first, last + datetime.timedelta(days=1)
+
+
+def daily_series(rows, first, days):
+    """Dense per-day room-nights and revenue from (day, nights, revenue) rows."""
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        booked, revenue = np.zeros(days), np.zeros(days)
+        if rows:
+            offsets = (np.array([row[0] for row in rows], dtype="datetime64[D]") - np.datetime64(first, "D")).astype(int)
+            values = np.array([row[1:] for row in rows], dtype=float)
+            booked[offsets], revenue[offsets] = values[:, 0], values[:, 1]
+        return booked.tolist(), revenue.tolist()
+    booked, revenue = [0.0] * days, [0.0] * days
+    for day, count, amount in rows:
+        offset = (datetime.date.fromisoformat(day) - first).days
+        booked[offset], revenue[offset] = float(count), float(amount)
+    return booked, revenue
+
+
+def metrics(name, rooms, room_nights_sold, revenue, days):
+    available = rooms * days
+    return {"room_type": name, "rooms": rooms, "room_nights": room_nights_sold, "revenue": revenue,
+            "occupancy": room_nights_sold / available if available else 0.0,
+            "adr": revenue / room_nights_sold if room_nights_sold else 0.0,  # average daily rate
+            "revpar": revenue / available if available else 0.0}
+
+
+def report(conn, start, end, room_type=None):
+    """Occupancy, ADR, RevPAR and revenue per room type for the inclusive range start..end.
+
+    Occupancy is measured against the current number of rooms of each type.
+    Returns {"rows": [...], "total": {...}, "days": [...], "occupancy": [...], "revenue": [...]}.
+    """
+    first, after = parse_range(start, end)
+    days = (after - first).days
+    params = [first.isoformat(), after.isoformat()]
+    type_filter = ""
+    if room_type:
+        type_filter, params = "AND room_type = ?", params + [room_type]
+
+    inventory = dict(conn.execute("SELECT COALESCE(room_type, ''), COUNT(*) FROM rooms GROUP BY 1"))
+    sold = {name: (count, amount) for name, count, amount in conn.execute(RANGE_SQL.format(type_filter=type_filter), params)}
+    names = [room_type] if room_type else sorted(set(inventory) | set(sold))
+    rows = [metrics(name, inventory.get(name, 0), *sold.get(name, (0, 0.0)), days) for name in names]
+    booked, revenue = daily_series(conn.execute(DAILY_SQL.format(type_filter=type_filter), params).fetchall(), first, days)
+    return summary(rows, [(first + datetime.timedelta(days=i)).isoformat() for i in range(days)], booked, revenue)
+
+
+def summary(rows, days, booked, revenue):
+    """The report dict from per room type rows and the nightly room-nights and revenue."""
+    total = metrics("All", sum(row["rooms"] for row in rows), sum(row["room_nights"] for row in rows),
+                    sum(row["revenue"] for row in rows), len(days))
+    rooms = total["rooms"]
+    return {"rows": rows, "total": total, "days": days,
+            "occupancy": [count / rooms if rooms else 0.0 for count in booked], "revenue": revenue}
+
+
+def merge_reports(reports):
+    """One report over several hotels from their reports for the same range and room type."""
+    sold = {}
+    for result in reports:
+        for row in result["rows"]:
+            entry = sold.setdefault(row["room_type"], [0, 0, 0.0])
+            entry[0] += row["rooms"]
+            entry[1] += row["room_nights"]
+            entry[2] += row["revenue"]
+    days = reports[0]["days"]
+    rows = [metrics(name, *values, len(days)) for name, values in sorted(sold.items())]
+    # Back from each hotel's occupancy to room-nights, which add up
+    booked = [sum(result["occupancy"][i] * result["total"]["rooms"] for result in reports) for i in range(len(days))]
+    revenue = [sum(result["revenue"][i] for result in reports) for i in range(len(days))]
+    return summary(rows, days, booked, revenue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Occupancy and revenue report from hotel.db")
+    parser.add_argument("--db", default="hotel.db")
+    parser.add_argument("--from", dest="start", default=(datetime.date.today() - datetime.timedelta(days=29)).isoformat())
+    parser.add_argument("--to", dest="end", default=datetime.date.today().isoformat())
+    parser.add_argument("--room-type")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the daily aggregates from bookings first")
+    args = parser.parse_args()
+
+    from migrations import HOTEL_MIGRATIONS, migrate
+    with sqlite3.connect(args.db) as conn:
+        migrate(conn, HOTEL_MIGRATIONS)
+        if args.rebuild:
+            print(f"{rebuild_daily_stats(conn)} daily rows rebuilt")
+            conn.commit()
+        result = report(conn, args.start, args.end, args.room_type)
+    print(f"{args.start} to {args.end}")
+    print(f"{'room type':<10} {'rooms':>6} {'nights':>8} {'occupancy':>9} {'ADR':>9} {'RevPAR':>9} {'revenue':>12}")
+    for row in result["rows"] + [result["total"]]:
+        print(f"{row['room_type']:<10} {row['rooms']:>6} {row['room_nights']:>8} {row['occupancy']:>9.1%} "
+              f"{row['adr']:>9.2f} {row['revpar']:>9.2f} {row['revenue']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import http.client
+import itertools
+import json
+import sqlite3
+import threading
+import urllib.parse
+
+from db import PAGE_SIZE
+from exporter import FETCH_SIZE, export_batches
+from hotel_import import read_rooms_csv
+from library_import import BATCH_SIZE, ImportReport, iter_csv_rows, iter_valid_rows
+
+# ---------- HTTP clients for api_server.py ----------
+# LibraryClient and HotelClient expose the same functions as library_data and
+# hotel_data, so LibraryApp / HotelManagementApp use either one unchanged.
+# Server errors come back as the exceptions the apps already handle:
+# 400 -> ValueError, 409 -> sqlite3.IntegrityError.
+
+
+class ApiClient:
+    def __init__(self, base_url, timeout=30):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.timeout = timeout
+        self._local = threading.local()  # one keep-alive connection per thread
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method, path, query=None, body=None):
+        if query:
+            path += "?" + urllib.parse.urlencode({k: v for k, v in query.items() if v is not None})
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = json.loads(response.read() or b"{}")
+                break
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if response.status == 400:
+            raise ValueError(payload.get("error"))
+        if response.status == 409:
+            raise sqlite3.IntegrityError(payload.get("error"))
+        if response.status != 200:
+            raise RuntimeError(f"{response.status}: {payload.get('error')}")
+        return payload["result"]
+
+
+class PartialImportError(Exception):
+    """An import through the server failed after some of its batches were added."""
+
+    def __init__(self, report, error):
+        super().__init__(f"{report.inserted} books were added before the import failed: {error}")
+        self.report = report
+
+
+def rows(result):
+    return [tuple(row) for row in result]
+
+
+def row(result):
+    return tuple(result) if result is not None else None
+
+
+def page_query(after, before, limit):
+    return {"after": after, "before": before, "limit": limit}
+
+
+def iter_pages(fetch_page, size):
+    """All rows of a keyset-paged listing, one page per request."""
+    # The server caps the page size, so a short page is not the last one:
+    # only an empty page ends the listing
+    page = fetch_page(limit=size)
+    while page:
+        yield page
+        page = fetch_page(after=page[-1][0], limit=size)
+
+
+class LibraryClient(ApiClient):
+    def connect(self, *args, **kwargs):
+        pass  # the server owns books.db and its schema
+
+    def view_page(self, after=None, before=None, limit=PAGE_SIZE):
+        return rows(self.request("GET", "/books", page_query(after, before, limit)))
+
+    def insert(self, title, author, year, isbn):
+        return row(self.request("POST", "/books", body={"title": title, "author": author, "year": year, "isbn": isbn}))
+
+    def update(self, book_id, title, author, year, isbn):
+        return row(self.request("PUT", f"/books/{int(book_id)}",
+                                body={"title": title, "author": author, "year": year, "isbn": isbn}))
+
+    def delete(self, book_id):
+        return self.request("DELETE", f"/books/{int(book_id)}")
+
+    def search(self, title="", author="", year="", isbn="", limit=None):
+        return rows(self.request("GET", "/books/search",
+                                 {"title": title, "author": author, "year": year, "isbn": isbn, "limit": limit}))
+
+    def import_job(self, file_path, task):
+        # Validate locally (the report keeps line numbers), then send batches to the server.
+        # Unlike library_data.import_job this is not all-or-nothing: each batch is its
+        # own transaction, and batches sent before a failure or Cancel stay added.
+        report = ImportReport()
+        valid = iter_valid_rows(iter_csv_rows(file_path), report)
+        while True:
+            batch = list(itertools.islice(valid, BATCH_SIZE))
+            if not batch:
+                break
+            try:
+                report.inserted += self.request("POST", "/books/batch", body={"rows": batch})
+            except Exception as e:
+                if not report.inserted:
+                    raise
+                raise PartialImportError(report, e) from e
+            task.progress(report.inserted)
+        return report
+
+    def export_job(self, file_path, filters, task):
+        if filters and any(filters):
+            results = self.search(*filters)
+            batches = (results[i:i + FETCH_SIZE] for i in range(0, len(results), FETCH_SIZE))
+        else:
+            batches = iter_pages(self.view_page, FETCH_SIZE)
+        export_batches(["ID", "Title", "Author", "Year", "ISBN"], batches, file_path, on_progress=task.progress)
+        return file_path
+
+
+class HotelClient(ApiClient):
+    def init_db(self):
+        pass  # the server owns hotel.db and its schema
+
+    def fetch_rooms_page(self, after=None, before=None, limit=PAGE_SIZE):
+        return rows(self.request("GET", "/rooms", page_query(after, before, limit)))
+
+    def fetch_bookings_page(self, after=None, before=None, limit=PAGE_SIZE):
+        return rows(self.request("GET", "/bookings", page_query(after, before, limit)))
+
+    def insert_room(self, room_number, room_type, price):
+        return row(self.request("POST", "/rooms", body={"room_number": room_number, "room_type": room_type, "price": price}))
+
+    def remove_room(self, room_number):
+        return self.request("DELETE", f"/rooms/{int(room_number)}")
+
+    def insert_guest(self, name, phone, email):
+        return row(self.request("POST", "/guests", body={"name": name, "phone": phone, "email": email}))
+
+    def book_room(self, room_number, guest_id, check_in_date, check_out_date):
+        booking, room = self.request("POST", "/bookings", body={
+            "room_number": room_number, "guest_id": guest_id, "check_in": check_in_date, "check_out": check_out_date})
+        return row(booking), row(room)
+
+    def cancel_booking(self, room_number, guest_id, check_in_date, check_out_date):
+        booking_ids, room = self.request("POST", "/bookings/cancel", body={
+            "room_number": room_number, "guest_id": guest_id, "check_in": check_in_date, "check_out": check_out_date})
+        return booking_ids, row(room)
+
+    def insert_rooms(self, rooms):
+        return rows(self.request("POST", "/rooms/batch", body={"rooms": [list(room) for room in rooms]}))
+
+    def import_rooms_job(self, path, task):
+        # Validated locally, then added in one request (one transaction on the server)
+        added = self.insert_rooms(read_rooms_csv(path))
+        task.progress(len(added))
+        return added
+
+    def book_rooms(self, stays):
+        bookings, rooms = self.request("POST", "/bookings/batch", body={"stays": [list(stay) for stay in stays]})
+        return rows(bookings), rows(rooms)
+
+    def check_out(self, booking_ids):
+        bookings, rooms = self.request("POST", "/bookings/checkout", body={"booking_ids": list(booking_ids)})
+        return rows(bookings), rows(rooms)
+
+    def occupancy_report(self, start, end, room_type=None):
+        return self.request("GET", "/analytics", {"start": start, "end": end, "room_type": room_type})
+
+    def find_free_rooms(self, check_in_date, check_out_date, room_type=None):
+        return rows(self.request("GET", "/rooms/free",
+                                 {"check_in": check_in_date, "check_out": check_out_date, "room_type": room_type}))
+
+    def export_table(self, table, path, task):
+        fetch_page = {"rooms": self.fetch_rooms_page, "bookings": self.fetch_bookings_page}[table]
+        columns = {"rooms": ["room_number", "room_type", "price", "is_available"],
+                   "bookings": ["booking_id", "room_number", "guest_id", "check_in_date", "check_out_date"]}[table]
+        return export_batches(columns, iter_pages(fetch_page, FETCH_SIZE), path, on_progress=task.progress)
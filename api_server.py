@@ -0,0 +1,291 @@
+import argparse
+import asyncio
+import datetime
+import json
+import re
+import sqlite3
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import hotel_data
+import library_data
+from db import PAGE_SIZE
+from instrumentation import install, log_error, profiler, setup_log
+from hotel_import import ROOM_COLUMNS, validate_room
+from library_import import REQUIRED_COLUMNS, validate_row
+
+# ---------- Local HTTP/JSON API over the library and hotel data layers ----------
+# asyncio handles the connections; reads run on a thread pool (one SQLite
+# connection per thread, WAL lets them run alongside the writer) and every
+# write goes through a single queue drained by one writer thread, so
+# concurrent clients never contend for the SQLite write lock.
+#
+#   python api_server.py --port 8080
+#   python main.py --server http://127.0.0.1:8080
+#   python Hotelmanagementystem.py --server http://127.0.0.1:8080
+
+HOST = "127.0.0.1"
+PORT = 8080
+READ_WORKERS = 8
+STATUS_CHECK_S = 60  # longest wait between checks for a new day
+MAX_BODY = 16 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class WriteQueue:
+    """Serialises every write onto one thread, in arrival order."""
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            fn, args, future = await self.queue.get()
+            try:
+                result = await loop.run_in_executor(self.executor, fn, *args)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def submit(self, fn, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((fn, args, future))
+        return await future
+
+
+# ----- Request argument helpers -----
+def page_args(query):
+    def number(name, default=None):
+        value = query.get(name)
+        return int(value) if value not in (None, "") else default
+    return number("after"), number("before"), min(number("limit", PAGE_SIZE), 1000)
+
+
+def require(body, *names):
+    missing = [name for name in names if body.get(name) in (None, "")]
+    if missing:
+        raise ValueError(f"Missing field(s): {', '.join(missing)}")
+    return [body[name] for name in names]
+
+
+def book_fields(body):
+    return [body.get(name, "") for name in ("title", "author", "year", "isbn")]
+
+
+def validated_rows(body):
+    rows = body.get("rows")
+    if not isinstance(rows, list):
+        raise ValueError("Expected a 'rows' list.")
+    return [validate_row(dict(zip(REQUIRED_COLUMNS, row))) for row in rows]
+
+
+def listed(body, name, length=None):
+    values = body.get(name)
+    if not isinstance(values, list) or not all(isinstance(v, list) and (length is None or len(v) == length)
+                                               for v in values):
+        raise ValueError(f"Expected a '{name}' list" + (f" of {length}-item lists." if length else "."))
+    return values
+
+
+def validated_rooms(body):
+    return [validate_room(dict(zip(ROOM_COLUMNS, room))) for room in listed(body, "rooms", len(ROOM_COLUMNS))]
+
+
+def booking_ids(body):
+    ids = body.get("booking_ids")
+    if not isinstance(ids, list):
+        raise ValueError("Expected a 'booking_ids' list.")
+    return [int(booking_id) for booking_id in ids]
+
+
+def diagnostics():
+    return profiler.snapshot()
+
+
+def cache_stats():
+    return {"books": library_data.cache_stats(), "hotel": hotel_data.cache_stats()}
+
+
+# (method, path pattern, "read"/"write", handler(match, query, body) -> (function, args))
+ROUTES = [
+    ("GET", r"/books", "read", lambda m, q, b: (library_data.view_page, page_args(q))),
+    ("GET", r"/books/search", "read",
+     lambda m, q, b: (library_data.search, [q.get(name, "") for name in ("title", "author", "year", "isbn")]
+                      + [int(q["limit"]) if q.get("limit") else None])),
+    ("POST", r"/books", "write", lambda m, q, b: (library_data.insert, book_fields(b))),
+    ("POST", r"/books/batch", "write", lambda m, q, b: (library_data.insert_many, [validated_rows(b)])),
+    ("PUT", r"/books/(\d+)", "write", lambda m, q, b: (library_data.update, [int(m[1])] + book_fields(b))),
+    ("DELETE", r"/books/(\d+)", "write", lambda m, q, b: (library_data.delete, [int(m[1])])),
+
+    ("GET", r"/rooms", "read", lambda m, q, b: (hotel_data.read_rooms_page, page_args(q))),
+    ("GET", r"/rooms/free", "read",
+     lambda m, q, b: (hotel_data.find_free_rooms, require(q, "check_in", "check_out") + [q.get("room_type") or None])),
+    ("POST", r"/rooms", "write",
+     lambda m, q, b: (hotel_data.insert_room, require(b, "room_number", "room_type", "price"))),
+    ("POST", r"/rooms/batch", "write", lambda m, q, b: (hotel_data.insert_rooms, [validated_rooms(b)])),
+    ("DELETE", r"/rooms/(\d+)", "write", lambda m, q, b: (hotel_data.remove_room, [int(m[1])])),
+    ("POST", r"/guests", "write", lambda m, q, b: (hotel_data.insert_guest, require(b, "name", "phone", "email"))),
+    ("GET", r"/bookings", "read", lambda m, q, b: (hotel_data.fetch_bookings_page, page_args(q))),
+    ("POST", r"/bookings", "write",
+     lambda m, q, b: (hotel_data.book_room, require(b, "room_number", "guest_id", "check_in", "check_out"))),
+    ("GET", r"/analytics", "read",
+     lambda m, q, b: (hotel_data.occupancy_report, require(q, "start", "end") + [q.get("room_type") or None])),
+    ("POST", r"/bookings/batch", "write", lambda m, q, b: (hotel_data.book_rooms, [listed(b, "stays", 4)])),
+    ("POST", r"/bookings/checkout", "write", lambda m, q, b: (hotel_data.check_out, [booking_ids(b)])),
+    ("POST", r"/bookings/cancel", "write",
+     lambda m, q, b: (hotel_data.cancel_booking, require(b, "room_number", "guest_id", "check_in", "check_out"))),
+
+    ("GET", r"/stats", "read", lambda m, q, b: (cache_stats, [])),
+    ("GET", r"/diagnostics", "read", lambda m, q, b: (diagnostics, [])),
+]
+ROUTES = [(method, re.compile(pattern + "$"), kind, handler) for method, pattern, kind, handler in ROUTES]
+
+
+class ApiServer:
+    def __init__(self, read_workers=READ_WORKERS):
+        self.readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="reader")
+        self.writes = WriteQueue()
+
+    def route(self, method, path):
+        allowed = False
+        for route_method, pattern, kind, handler in ROUTES:
+            match = pattern.match(path)
+            if match:
+                if route_method == method:
+                    return kind, handler, match
+                allowed = True
+        raise HttpError(405 if allowed else 404, f"No route for {method} {path}")
+
+    async def dispatch(self, method, target, body):
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        kind, handler, match = self.route(method, url.path)
+        try:
+            fn, args = handler(match, query, body)
+            if kind == "write":
+                return await self.writes.submit(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self.readers, fn, *args)
+        except ValueError as e:
+            raise HttpError(400, str(e))
+        except sqlite3.IntegrityError as e:
+            raise HttpError(409, str(e))
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise HttpError(413, "Request body too large")
+        raw = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method, target, raw, keep_alive
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    break
+                except HttpError as e:
+                    await self.respond(writer, e.status, {"error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, target, raw, keep_alive = request
+                try:
+                    body = json.loads(raw) if raw else {}
+                    status, payload = 200, {"result": await self.dispatch(method, target, body)}
+                except json.JSONDecodeError:
+                    status, payload = 400, {"error": "Request body is not valid JSON"}
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    log_error(e, f"{method} {target}")
+                    status, payload = 500, {"error": f"An unexpected error occurred: {e}"}
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def refresh_status(self):
+        # Tonight's room status changes at midnight. Readers never write, so the
+        # writer recomputes it (hotel_data.refresh_status) once the day changes.
+        while True:
+            now = datetime.datetime.now()
+            midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+            await asyncio.sleep(min((midnight - now).total_seconds(), STATUS_CHECK_S))
+            try:
+                await self.writes.submit(hotel_data.refresh_status)
+            except Exception as e:
+                log_error(e, "room status refresh")
+
+    async def serve(self, host=HOST, port=PORT, ready=None):
+        writer_task = asyncio.create_task(self.writes.run())
+        # Schema setup goes through the writer before the first request is accepted
+        await self.writes.submit(library_data.connect)
+        await self.writes.submit(hotel_data.init_db)
+        status_task = asyncio.create_task(self.refresh_status())
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            status_task.cancel()
+            writer_task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for the library and hotel data")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--read-workers", type=int, default=READ_WORKERS)
+    args = parser.parse_args()
+
+    install(library_data.books_db, hotel_data.hotel_db)
+    setup_log()
+    api = ApiServer(args.read_workers)
+    print(f"Serving on http://{args.host}:{args.port}", flush=True)
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
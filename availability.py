@@ -0,0 +1,96 @@
+import datetime
+
+# ---------- Room availability from booking date ranges ----------
+# Stays are half-open intervals [check_in, check_out) on ISO dates, so string
+# comparison is date comparison. Bookings of one room never overlap each other
+# (book_room enforces it), which lets every probe be two index seeks on
+# (room_number, check_in_date) instead of scanning the room's whole history:
+#   1. a booking that starts inside [check_in, check_out), or
+#   2. the last booking starting before check_in, if it ends after check_in.
+
+AVAILABILITY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_bookings_room_dates ON bookings(room_number, check_in_date, check_out_date, guest_id)",
+    "CREATE INDEX IF NOT EXISTS idx_rooms_type ON rooms(room_type, room_number)",
+]
+
+OVERLAP_SQL = """
+    SELECT booking_id FROM bookings
+     WHERE room_number = :room AND check_in_date >= :check_in AND check_in_date < :check_out
+    UNION ALL
+    SELECT booking_id FROM (
+        SELECT booking_id, check_out_date FROM bookings
+         WHERE room_number = :room AND check_in_date < :check_in
+         ORDER BY check_in_date DESC LIMIT 1)
+     WHERE check_out_date > :check_in
+"""
+
+FREE_ROOMS_SQL = """
+    SELECT r.* FROM rooms r
+     WHERE {type_filter}
+       NOT EXISTS (SELECT 1 FROM bookings b
+                    WHERE b.room_number = r.room_number
+                      AND b.check_in_date >= :check_in AND b.check_in_date < :check_out)
+       AND COALESCE((SELECT b.check_out_date FROM bookings b
+                      WHERE b.room_number = r.room_number AND b.check_in_date < :check_in
+                      ORDER BY b.check_in_date DESC LIMIT 1), '') <= :check_in
+     ORDER BY r.room_number
+"""
+
+# Every room at once: occupied tonight when its last stay starting by today ends after today
+ALL_ROOMS_STATUS_SQL = """
+    UPDATE rooms SET is_available = COALESCE((SELECT b.check_out_date FROM bookings b
+                                               WHERE b.room_number = rooms.room_number AND b.check_in_date <= :today
+                                               ORDER BY b.check_in_date DESC LIMIT 1), '') <= :today
+"""
+
+
+def ensure_availability_indexes(conn):
+    for statement in AVAILABILITY_INDEXES:
+        conn.execute(statement)
+    conn.commit()
+
+
+def validate_stay(check_in_date, check_out_date):
+    try:
+        check_in = datetime.datetime.strptime(check_in_date, '%Y-%m-%d').date()
+        check_out = datetime.datetime.strptime(check_out_date, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("Incorrect date format, should be YYYY-MM-DD")
+    if check_out <= check_in:
+        raise ValueError("Check-out date must be after check-in date.")
+    # Normalise e.g. 2025-1-5 to 2025-01-05 so string order matches date order
+    return check_in.isoformat(), check_out.isoformat()
+
+
+def overlapping_bookings(conn, room_number, check_in_date, check_out_date):
+    params = {"room": room_number, "check_in": check_in_date, "check_out": check_out_date}
+    return [row[0] for row in conn.execute(OVERLAP_SQL, params)]
+
+
+def is_room_free(conn, room_number, check_in_date, check_out_date):
+    return not overlapping_bookings(conn, room_number, check_in_date, check_out_date)
+
+
+def free_rooms(conn, check_in_date, check_out_date, room_type=None):
+    """Rooms (optionally of one type) with no booking overlapping [check_in, check_out)."""
+    params = {"check_in": check_in_date, "check_out": check_out_date, "room_type": room_type}
+    type_filter = "r.room_type = :room_type AND" if room_type else ""
+    return conn.execute(FREE_ROOMS_SQL.format(type_filter=type_filter), params).fetchall()
+
+
+def refresh_room_status(conn, room_number, today=None):
+    """Keep rooms.is_available meaning 'not occupied tonight'."""
+    refresh_rooms_status(conn, [room_number], today)
+
+
+def refresh_rooms_status(conn, room_numbers, today=None):
+    day = today or datetime.date.today()
+    tonight = (day.isoformat(), (day + datetime.timedelta(days=1)).isoformat())
+    conn.executemany("UPDATE rooms SET is_available = ? WHERE room_number = ?",
+                     [(int(is_room_free(conn, room_number, *tonight)), room_number) for room_number in room_numbers])
+
+
+def refresh_all_rooms_status(conn, today=None):
+    """refresh_rooms_status for every room; stays start and end as days pass without any write."""
+    day = today or datetime.date.today()
+    conn.execute(ALL_ROOMS_STATUS_SQL, {"today": day.isoformat()})
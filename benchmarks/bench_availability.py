@@ -0,0 +1,95 @@
+import argparse
+import datetime
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import ensure_availability_indexes, free_rooms, is_room_free
+
+# Availability queries against a naive scan of every booking.
+#   python benchmarks/bench_availability.py --rooms 2000 --years 3
+
+ROOM_TYPES = ["Single", "Double", "Suite"]
+
+
+def build_hotel(path, rooms, years, seed=7):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE rooms (room_number INTEGER PRIMARY KEY, room_type TEXT, price REAL, is_available INTEGER DEFAULT 1)")
+    conn.execute("CREATE TABLE bookings (booking_id INTEGER PRIMARY KEY AUTOINCREMENT, room_number INTEGER, guest_id INTEGER, check_in_date TEXT, check_out_date TEXT)")
+    conn.executemany("INSERT INTO rooms (room_number, room_type, price) VALUES (?, ?, ?)",
+                     ((n, rng.choice(ROOM_TYPES), rng.choice([80.0, 120.0, 300.0])) for n in range(1, rooms + 1)))
+    start = datetime.date(2023, 1, 1)
+    end = start + datetime.timedelta(days=365 * years)
+
+    def stays():
+        for room in range(1, rooms + 1):
+            day = start + datetime.timedelta(days=rng.randint(0, 5))
+            while day < end:
+                nights = rng.randint(1, 7)
+                yield room, rng.randint(1, 10000), day.isoformat(), (day + datetime.timedelta(days=nights)).isoformat()
+                day += datetime.timedelta(days=nights + rng.randint(0, 4))
+
+    conn.executemany("INSERT INTO bookings (room_number, guest_id, check_in_date, check_out_date) VALUES (?, ?, ?, ?)", stays())
+    conn.commit()
+    ensure_availability_indexes(conn)
+    conn.execute("ANALYZE")
+    return conn
+
+
+def naive_free_rooms(conn, check_in, check_out, room_type):
+    rooms = conn.execute("SELECT room_number FROM rooms WHERE room_type = ?", (room_type,)).fetchall()
+    booked = {room for room, start, end in conn.execute("SELECT room_number, check_in_date, check_out_date FROM bookings")
+              if start < check_out and end > check_in}
+    return [room for (room,) in rooms if room not in booked]
+
+
+def naive_is_free(conn, room, check_in, check_out):
+    for start, end in conn.execute("SELECT check_in_date, check_out_date FROM bookings WHERE room_number = ?", (room,)):
+        if start < check_out and end > check_in:
+            return False
+    return True
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed availability queries vs naive scan")
+    parser.add_argument("--rooms", type=int, default=2000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_hotel(os.path.join(tmp, "hotel.db"), args.rooms, args.years)
+        bookings = conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        print(f"{args.rooms} rooms, {bookings} bookings")
+        stay = ("2024-06-10", "2024-06-13")
+        room = args.rooms // 2
+
+        assert sorted(r[0] for r in free_rooms(conn, *stay, "Suite")) == naive_free_rooms(conn, *stay, "Suite")
+        assert is_room_free(conn, room, *stay) == naive_is_free(conn, room, *stay)
+
+        rows = [
+            ("free Suite rooms", lambda: naive_free_rooms(conn, *stay, "Suite"), lambda: free_rooms(conn, *stay, "Suite")),
+            ("overlap check, one room", lambda: naive_is_free(conn, room, *stay), lambda: is_room_free(conn, room, *stay)),
+        ]
+        print(f"{'query':<26} {'naive ms':>10} {'indexed ms':>11}")
+        for label, naive, indexed in rows:
+            print(f"{label:<26} {best_ms(naive, args.repeat):>10.3f} {best_ms(indexed, args.repeat):>11.3f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import datetime
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hotel_data
+from availability import is_room_free
+from db import Database
+
+# Several processes booking the same few rooms at once, as several copies of
+# the hotel app on one hotel.db would. Every process tries random short stays
+# in a narrow window so most attempts collide; afterwards the bookings table
+# is checked for overlapping stays.
+#   python benchmarks/bench_booking_contention.py --processes 8 --attempts 500
+#   python benchmarks/bench_booking_contention.py --naive   # the old check-then-insert path
+
+START = datetime.date(2025, 1, 1)
+
+OVERLAPS_SQL = """
+    SELECT COUNT(*) FROM bookings a JOIN bookings b
+      ON a.room_number = b.room_number AND a.booking_id < b.booking_id
+     WHERE a.check_in_date < b.check_out_date AND b.check_in_date < a.check_out_date
+"""
+
+
+def setup(path, rooms, guests):
+    hotel_data.hotel_db = Database(path)
+    hotel_data.init_db()
+    conn = hotel_data.hotel_db.connection()
+    conn.executemany("INSERT INTO rooms (room_number, room_type, price) VALUES (?, 'Double', 120.0)",
+                     ((n,) for n in range(1, rooms + 1)))
+    conn.executemany("INSERT INTO guests (name, phone, email) VALUES (?, '', '')",
+                     ((f"guest {n}",) for n in range(guests)))
+    conn.commit()
+    hotel_data.hotel_db.close()
+
+
+def naive_book(room_number, guest_id, check_in_date, check_out_date):
+    # What create_booking() used to do: check, then write, in separate statements
+    conn = hotel_data.hotel_db.connection()
+    if not is_room_free(conn, room_number, check_in_date, check_out_date):
+        raise ValueError("Room is not available for these dates.")
+    conn.execute("INSERT INTO bookings (room_number, guest_id, check_in_date, check_out_date) VALUES (?, ?, ?, ?)",
+                 (room_number, guest_id, check_in_date, check_out_date))
+    conn.commit()
+
+
+def worker(path, seed, attempts, rooms, guests, days, naive, start_at):
+    hotel_data.hotel_db = Database(path)
+    book = naive_book if naive else hotel_data.book_room
+    rng = random.Random(seed)
+    booked = rejected = 0
+    while time.time() < start_at:  # start every process together
+        time.sleep(0.001)
+    for _ in range(attempts):
+        day = START + datetime.timedelta(days=rng.randrange(days))
+        stay = (day.isoformat(), (day + datetime.timedelta(days=rng.randint(1, 3))).isoformat())
+        try:
+            book(rng.randint(1, rooms), rng.randint(1, guests), *stay)
+            booked += 1
+        except ValueError:
+            rejected += 1
+    return booked, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent bookings from several processes")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=500, help="booking attempts per process")
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--days", type=int, default=60, help="width of the date window stays fall in")
+    parser.add_argument("--naive", action="store_true", help="use an unlocked check-then-insert instead")
+    args = parser.parse_args()
+
+    guests = 100
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.db")
+        setup(path, args.rooms, guests)
+
+        start_at = time.time() + 0.5
+        jobs = [(path, seed, args.attempts, args.rooms, guests, args.days, args.naive, start_at)
+                for seed in range(args.processes)]
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            results = pool.starmap(worker, jobs)
+            elapsed = time.time() - start_at
+
+        booked = sum(b for b, _ in results)
+        rejected = sum(r for _, r in results)
+        db = Database(path)
+        stored = db.query("SELECT COUNT(*) FROM bookings")[0][0]
+        overlaps = db.query(OVERLAPS_SQL)[0][0]
+        db.close()
+
+    mode = "naive check-then-insert" if args.naive else "BEGIN IMMEDIATE"
+    print(f"{mode}: {args.processes} processes x {args.attempts} attempts on {args.rooms} rooms")
+    print(f"  booked {booked}, rejected {rejected}, stored {stored}")
+    print(f"  {booked / elapsed:,.0f} bookings/s, {(booked + rejected) / elapsed:,.0f} attempts/s")
+    print(f"  double bookings: {overlaps}")
+    if overlaps and not args.naive:
+        raise SystemExit("overlapping bookings found")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import library_data
+from catalog import Catalog
+from db import Database
+from synthetic import populate_library
+
+# Kiosk startup, memory and query latency: books.db through SQLite against the
+# memory-mapped catalog snapshot. Startup runs in a fresh interpreter per
+# backend (import, open, first page, then QUERIES) and reports its resident
+# memory split into private (anonymous) and file-backed pages; the snapshot's
+# pages are file-backed, so they are shared by every kiosk on the machine.
+#   python benchmarks/bench_catalog.py --sizes 10000 100000 1000000
+
+QUERIES = [
+    {"title": "drag"},
+    {"title": "silver storm"},
+    {"author": "tolk"},
+    {"year": "1999"},
+    {"year": "1999", "author": "a"},
+    {"isbn": "978123"},
+]
+
+# Run in the child interpreter: sys.argv = [mode, db, queries as JSON]; prints one JSON line
+STARTUP = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+mode, path, queries = sys.argv[1:]
+
+
+def memory():
+    found = {{}}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("VmRSS", "VmHWM", "RssAnon", "RssFile"):
+                    found[name] = int(value.split()[0]) // 1024
+    except OSError:  # not Linux
+        pass
+    return found
+
+
+if mode == "snapshot":
+    from catalog import Catalog
+    backend = Catalog(path)
+    backend.connect()
+else:
+    import library_data
+    from db import Database
+    library_data.books_db = Database(path)
+    library_data.connect(path, seed=False)
+    backend = library_data
+page = backend.view_page()
+first_page = time.perf_counter() - start
+opened = memory()
+for query in json.loads(queries):
+    backend.search(**query)
+print(json.dumps({{"first_page_ms": first_page * 1000, "opened": opened, "searched": memory()}}))
+"""
+
+
+def startup(mode, path):
+    script = STARTUP.format(root=ROOT)
+    output = subprocess.run([sys.executable, "-c", script, mode, path, json.dumps(QUERIES)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def best_ms(fn, repeat, before=None):
+    best = float("inf")
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kiosk catalog: SQLite vs memory-mapped snapshot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"books_{size}.db")
+            conn = sqlite3.connect(path)
+            populate_library(conn, size)
+            conn.close()
+
+            catalog = Catalog(path)
+            start = time.perf_counter()
+            catalog.connect()
+            build_ms = (time.perf_counter() - start) * 1000
+            megabytes = os.path.getsize(catalog.snapshot.path) / 1024 / 1024
+            print(f"{size:>9} rows: snapshot built in {build_ms:.0f} ms, {megabytes:.1f} MB "
+                  f"(books.db {os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+            entry = {"size": size, "build_ms": round(build_ms, 1), "snapshot_mb": round(megabytes, 2), "startup": {}, "queries": []}
+
+            # Resident MB after the first page and after running QUERIES: private / file-backed, and the peak
+            print(f"{'':>9}  {'startup':<34} {'first page ms':>13} {'opened MB':>10} {'searched MB':>12} {'peak MB':>8}")
+            for mode in ("sqlite", "snapshot"):
+                measured = startup(mode, path)
+                entry["startup"][mode] = measured
+                opened, searched = measured["opened"], measured["searched"]
+                print(f"{'':>9}  {mode:<34} {measured['first_page_ms']:>13.1f} "
+                      f"{opened.get('RssAnon', 0):>5}/{opened.get('RssFile', 0):<4} "
+                      f"{searched.get('RssAnon', 0):>6}/{searched.get('RssFile', 0):<5} {searched.get('VmHWM', 0):>8}")
+
+            library_data.books_db = Database(path)
+            print(f"{'':>9}  {'query':<34} {'SQLite ms':>9} {'snapshot ms':>11} {'rows':>7}")
+            for query in QUERIES:
+                # Cold cache each time, or the repeats would time a dict lookup
+                sqlite_ms = best_ms(lambda: library_data.search(**query), args.repeat, before=library_data.books_cache.invalidate)
+                snapshot_ms = best_ms(lambda: catalog.search(**query), args.repeat)
+                label = ", ".join(f"{k}={v}" for k, v in query.items())
+                rows = len(catalog.search(**query))
+                entry["queries"].append({"query": query, "sqlite_ms": round(sqlite_ms, 3),
+                                         "snapshot_ms": round(snapshot_ms, 3), "rows": rows})
+                print(f"{'':>9}  {label:<34} {sqlite_ms:>9.2f} {snapshot_ms:>11.2f} {rows:>7}")
+            catalog.snapshot.close()
+            catalog.snapshot = None
+            results.append(entry)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import Database
+from library_search import ensure_search_index, search_books
+
+# Per-operation latency of the library CRUD functions: a new sqlite3.connect()
+# per call (the original main.py) against the shared per-thread Database.
+#   python benchmarks/bench_db_access.py --rows 10000 --ops 2000
+
+
+def make_catalog(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT, author TEXT, year INTEGER, isbn TEXT)")
+    conn.executemany("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)",
+                     ((f"Title {i}", f"Author {i % 500}", 1900 + i % 120, f"978{i:010d}") for i in range(rows)))
+    conn.commit()
+    ensure_search_index(conn)
+    conn.close()
+
+
+def per_call_ops(path):
+    def get(book_id):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT * FROM books WHERE id=?", (book_id,)).fetchone()
+
+    def insert(i):
+        with sqlite3.connect(path) as conn:
+            conn.execute("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", (f"New {i}", "Bench", 2000, "9780000000000"))
+
+    def update(book_id):
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE books SET year=? WHERE id=?", (2001, book_id))
+
+    def search(i):
+        with sqlite3.connect(path) as conn:
+            return search_books(conn, author=f"Author {i % 500}")
+
+    return {"get": get, "insert": insert, "update": update, "search": search}
+
+
+def pooled_ops(path):
+    database = Database(path)
+
+    def get(book_id):
+        return database.query("SELECT * FROM books WHERE id=?", (book_id,))
+
+    def insert(i):
+        with database.transaction() as conn:
+            conn.execute("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", (f"New {i}", "Bench", 2000, "9780000000000"))
+
+    def update(book_id):
+        with database.transaction() as conn:
+            conn.execute("UPDATE books SET year=? WHERE id=?", (2001, book_id))
+
+    def search(i):
+        return search_books(database.connection(), author=f"Author {i % 500}")
+
+    return {"get": get, "insert": insert, "update": update, "search": search}
+
+
+def measure(ops, count):
+    results = {}
+    for name, fn in ops.items():
+        start = time.perf_counter()
+        for i in range(1, count + 1):
+            fn(i)
+        results[name] = (time.perf_counter() - start) / count * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call connect vs shared connection latency")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path, after_path = os.path.join(tmp, "before.db"), os.path.join(tmp, "after.db")
+        make_catalog(before_path, args.rows)
+        make_catalog(after_path, args.rows)
+        before = measure(per_call_ops(before_path), args.ops)
+        after = measure(pooled_ops(after_path), args.ops)
+
+    print(f"{'operation':<10} {'before us/op':>13} {'after us/op':>12} {'speedup':>8}")
+    for name in before:
+        print(f"{name:<10} {before[name]:>13.1f} {after[name]:>12.1f} {before[name] / after[name]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from library_search import ensure_search_index, like_search, search_books
+from synthetic import FIRST, LAST, WORDS
+
+# Search latency vs catalog size: the original LIKE '%...%' scan against the FTS5 index.
+#   python benchmarks/bench_search.py --sizes 1000 10000 100000
+
+QUERIES = [
+    {"title": "drag"},
+    {"title": "silver storm"},
+    {"author": "tolk"},
+    {"title": "kingdom", "author": "austen"},
+    {"isbn": "978123"},
+]
+
+
+def build_catalog(path, size, seed=42):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE books (id INTEGER PRIMARY KEY, title TEXT, author TEXT, year INTEGER, isbn TEXT)")
+    rows = ((" ".join(rng.sample(WORDS, 3)).title(), f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+             rng.randint(1800, 2024), f"978{rng.randrange(10**10):010d}") for _ in range(size))
+    conn.executemany("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", rows)
+    conn.commit()
+    ensure_search_index(conn)
+    return conn
+
+
+def time_query(fn, conn, query, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn, **query)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LIKE vs FTS5 search latency by catalog size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}  {'query':<34} {'LIKE ms':>9} {'FTS ms':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            conn = build_catalog(os.path.join(tmp, f"books_{size}.db"), size)
+            for query in QUERIES:
+                like_ms = time_query(like_search, conn, query, args.repeat)
+                fts_ms = time_query(search_books, conn, query, args.repeat)
+                label = ", ".join(f"{k}={v}" for k, v in query.items())
+                print(f"{size:>9}  {label:<34} {like_ms:>9.2f} {fts_ms:>9.2f} {like_ms / fts_ms:>7.1f}x")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hotel_data
+from db import Database
+from shards import ShardedHotel, load_properties, split
+from synthetic import populate_hotel
+
+# Throughput of one hotel.db against the same data split into properties
+# (shards.py) with a growing process pool. Several client threads at once
+# search free Suites across every property, then book random short stays.
+#   python benchmarks/bench_shards.py --bookings 100000 --properties 4 --workers 1 2 4
+
+START = datetime.date(2031, 1, 1)  # after the synthetic bookings, so most booking attempts succeed
+
+
+def stay(rng, days=3):
+    day = START + datetime.timedelta(days=rng.randrange(365))
+    return day.isoformat(), (day + datetime.timedelta(days=rng.randint(1, days))).isoformat()
+
+
+def clients(count, fn, seconds):
+    """Run fn(rng) from `count` threads for `seconds`; returns (calls, ValueErrors) per second."""
+    done, rejected = [0] * count, [0] * count
+    stop = time.perf_counter() + seconds
+
+    def client(i):
+        rng = random.Random(i)
+        while time.perf_counter() < stop:
+            try:
+                fn(rng)
+                done[i] += 1
+            except ValueError:
+                rejected[i] += 1
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done) / seconds, sum(rejected) / seconds
+
+
+def measure(label, backend, rooms, guests, args):
+    free, _ = clients(args.clients, lambda rng: backend.find_free_rooms(*stay(rng, 7), "Suite"), args.seconds)
+    booked, rejected = clients(args.clients, lambda rng: backend.book_room(
+        rng.choice(rooms), rng.choice(guests), *stay(rng)), args.seconds)
+    print(f"{label:<22} {free:>14,.0f} {booked:>12,.0f} {rejected:>12,.0f}", flush=True)
+    return {"backend": label, "free_suites_per_s": round(free, 1), "bookings_per_s": round(booked, 1),
+            "rejected_per_s": round(rejected, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One hotel.db vs one database per property")
+    parser.add_argument("--bookings", type=int, default=100000)
+    parser.add_argument("--properties", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8, help="threads issuing calls at once")
+    parser.add_argument("--seconds", type=float, default=3.0, help="per measurement")
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hotel.db")
+        conn = sqlite3.connect(path)
+        room_count, guest_count = populate_hotel(conn, args.bookings)
+        conn.close()
+        rooms = list(range(101, 101 + room_count))
+        per_property = -(-room_count // args.properties)
+        with open(os.path.join(tmp, "properties.json"), "w") as f:
+            json.dump({"properties": [{"name": f"Property {i + 1}", "db": f"property{i + 1}.db",
+                                       "rooms": [101 + i * per_property, 100 + (i + 1) * per_property]}
+                                      for i in range(args.properties)]}, f)
+        properties = load_properties(os.path.join(tmp, "properties.json"))
+        guests = list(range(1, guest_count + 1))
+        print(f"{room_count} rooms, {guest_count} guests, {args.bookings} bookings; "
+              f"{args.properties} properties, {args.clients} clients, {os.cpu_count()} CPUs")
+        print(f"{'backend':<22} {'free Suites/s':>14} {'bookings/s':>12} {'rejected/s':>12}")
+
+        for workers in args.workers:
+            # Fresh property databases from the untouched hotel.db for every pool
+            for prop in properties:
+                for name in (prop.path, prop.path + "-wal", prop.path + "-shm"):
+                    if os.path.exists(name):
+                        os.remove(name)
+            split(path, properties)
+            hotel = ShardedHotel(properties, workers)
+            try:
+                hotel.init_db()
+                results.append(measure(f"sharded, {workers} workers", hotel, rooms, guests, args))
+            finally:
+                hotel.close()
+        hotel_data.hotel_db = Database(path)
+        results.append(measure("hotel.db", hotel_data, rooms, guests, args))
+        hotel_data.hotel_db.close()
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hotel_data
+import library_data
+from db import Database
+from synthetic import BOOKINGS_START, populate_hotel, write_books_csv
+
+# Headless timings of the library and hotel data layers (no Tk needed) at one
+# or more scales, written as JSON so runs from two commits can be compared.
+#   python benchmarks/run_benchmarks.py --scales 1000 10000 100000 --out new.json
+#   python benchmarks/run_benchmarks.py --scales 1000 10000 --out new.json --compare old.json
+# Each scale is the number of books and, separately, the number of bookings.
+
+FULL_VIEW_MAX = 1_000_000  # view() loads the whole table; skipped above this
+# Exports rewrite the whole file, so they get at most 3 runs
+
+
+class NullTask:
+    def progress(self, value):
+        pass
+
+
+class Results:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, scale, name, seconds):
+        ms = [s * 1000 for s in seconds]
+        self.rows.append({"scale": scale, "name": name, "runs": len(ms), "min_ms": round(min(ms), 4),
+                          "median_ms": round(statistics.median(ms), 4), "mean_ms": round(statistics.fmean(ms), 4)})
+        print(f"{scale:>10}  {name:<34} {statistics.median(ms):>10.3f} ms  (min {min(ms):.3f}, n={len(ms)})", flush=True)
+
+    def time(self, scale, name, fn, repeat=5, before=None):
+        seconds = []
+        for _ in range(repeat):
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            fn()
+            seconds.append(time.perf_counter() - start)
+        self.add(scale, name, seconds)
+
+    def time_each(self, scale, name, fn, args_list):
+        """Time fn(*args) once per entry of args_list; returns the results."""
+        seconds, results = [], []
+        for args in args_list:
+            start = time.perf_counter()
+            results.append(fn(*args))
+            seconds.append(time.perf_counter() - start)
+        self.add(scale, name, seconds)
+        return results
+
+
+def bench_library(results, scale, tmp, repeat, ops):
+    path = os.path.join(tmp, "books.db")
+    write_books_csv("sample_books_dataset.csv", scale)  # connect() seeds from this file in the cwd
+    library_data.books_db = Database(path)
+    results.time(scale, "library.connect_seed", lambda: library_data.connect(path), repeat=1)
+    cold = library_data.books_cache.invalidate
+
+    if scale <= FULL_VIEW_MAX:
+        results.time(scale, "library.view", library_data.view, repeat, before=cold)
+    results.time(scale, "library.view_page.first", library_data.view_page, repeat, before=cold)
+    results.time(scale, "library.view_page.deep", lambda: library_data.view_page(after=scale // 2), repeat, before=cold)
+
+    sample = library_data.books_db.query("SELECT title, author, isbn FROM books WHERE id = ?", (scale // 3 + 1,))[0]
+    searches = {
+        "title": {"title": sample[0].split()[0][:4]},
+        "title_author": {"title": sample[0].split()[1], "author": sample[1].split()[1]},
+        "isbn_prefix": {"isbn": sample[2][:7]},
+        "year": {"year": "1999"},
+    }
+    for label, query in searches.items():
+        results.time(scale, f"library.search.{label}", lambda: library_data.search(**query), repeat, before=cold)
+    results.time(scale, "library.search.title.cached", lambda: library_data.search(**searches["title"]), repeat)
+
+    inserted = results.time_each(scale, "library.insert", library_data.insert,
+                                 [(f"Bench Title {i}", "Bench Author", 2000, "9780000000000") for i in range(ops)])
+    ids = [row[0] for row in inserted]
+    results.time_each(scale, "library.update", library_data.update,
+                      [(book_id, f"Bench Title {i} v2", "Bench Author", 2001, "9780000000000") for i, book_id in enumerate(ids)])
+    results.time_each(scale, "library.delete", library_data.delete, [(book_id,) for book_id in ids])
+
+    export = os.path.join(tmp, "books.csv")
+    results.time(scale, "library.export.all_csv",
+                 lambda: library_data.export_job(export, ("", "", "", ""), NullTask()), min(repeat, 3))
+    results.time(scale, "library.export.search_jsonl",
+                 lambda: library_data.export_job(export + ".jsonl", (searches["title"]["title"], "", "", ""), NullTask()),
+                 min(repeat, 3))
+    library_data.books_db.close()
+
+
+def bench_hotel(results, scale, tmp, repeat, ops):
+    path = os.path.join(tmp, "hotel.db")
+    with sqlite3.connect(path) as conn:
+        start = time.perf_counter()
+        rooms, guests = populate_hotel(conn, scale)
+        results.add(scale, "hotel.seed", [time.perf_counter() - start])
+    hotel_data.hotel_db = Database(path)
+    hotel_data.hotel_cache.invalidate()
+    results.time(scale, "hotel.init_db", hotel_data.init_db, repeat=1)
+    cold = hotel_data.hotel_cache.invalidate
+    rng = random.Random(2)
+
+    results.time(scale, "hotel.rooms_page.first", hotel_data.fetch_rooms_page, repeat, before=cold)
+    results.time(scale, "hotel.bookings_page.deep", lambda: hotel_data.fetch_bookings_page(after=scale // 2), repeat)
+    stay = ((BOOKINGS_START + datetime.timedelta(days=30)).isoformat(),
+            (BOOKINGS_START + datetime.timedelta(days=33)).isoformat())
+    results.time(scale, "hotel.find_free_rooms.suite", lambda: hotel_data.find_free_rooms(*stay, "Suite"), repeat)
+    results.time(scale, "hotel.find_free_rooms.all", lambda: hotel_data.find_free_rooms(*stay), repeat)
+    month = (BOOKINGS_START.isoformat(), (BOOKINGS_START + datetime.timedelta(days=30)).isoformat())
+    results.time(scale, "hotel.occupancy_report.month", lambda: hotel_data.occupancy_report(*month), repeat)
+    results.time(scale, "hotel.occupancy_report.3_years",
+                 lambda: hotel_data.occupancy_report(BOOKINGS_START.isoformat(), "2025-12-31"), repeat)
+
+    # Stays in 2100 never collide with the generated history
+    far = [datetime.date(2100, 1, 1) + datetime.timedelta(days=3 * i) for i in range(ops)]
+    stays = [(rng.randrange(101, 101 + rooms), rng.randint(1, guests), day.isoformat(),
+              (day + datetime.timedelta(days=2)).isoformat()) for day in far]
+    results.time_each(scale, "hotel.book_room", hotel_data.book_room, stays)
+    results.time_each(scale, "hotel.cancel_booking", hotel_data.cancel_booking, stays)
+
+    new_rooms = [(100000 + i, "Double", 120.0) for i in range(ops)]
+    results.time_each(scale, "hotel.add_room", hotel_data.insert_room, new_rooms)
+    results.time_each(scale, "hotel.delete_room", hotel_data.remove_room, [(room[0],) for room in new_rooms])
+    results.time_each(scale, "hotel.add_guest", hotel_data.insert_guest,
+                      [(f"Bench Guest {i}", "+15550000000", f"bench{i}@example.com") for i in range(ops)])
+
+    # The same amount of work as one batch each: ops rooms, a group booking of
+    # them and the check-out of that group, one transaction apiece
+    batch_rooms = [(200000 + i, "Suite", 300.0) for i in range(ops)]
+    results.time(scale, f"hotel.add_rooms_batch.{ops}", lambda: hotel_data.insert_rooms(batch_rooms), repeat=1)
+    today = datetime.date.today()
+    group = [(room[0], 1, (today - datetime.timedelta(days=1)).isoformat(), (today + datetime.timedelta(days=2)).isoformat())
+             for room in batch_rooms]
+    booked = []
+    results.time(scale, f"hotel.book_rooms_batch.{ops}", lambda: booked.extend(hotel_data.book_rooms(group)[0]), repeat=1)
+    results.time(scale, f"hotel.check_out_batch.{ops}", lambda: hotel_data.check_out([row[0] for row in booked]), repeat=1)
+
+    export = os.path.join(tmp, "bookings.csv")
+    results.time(scale, "hotel.export.bookings_csv", lambda: hotel_data.export_table("bookings", export, NullTask()),
+                 min(repeat, 3))
+    hotel_data.hotel_db.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old_path, new, threshold):
+    """Print median ratios against an earlier run; returns the number of regressions."""
+    with open(old_path, encoding="utf-8") as f:
+        old = {(row["scale"], row["name"]): row for row in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n{'scale':>10}  {'operation':<34} {'old ms':>10} {'new ms':>10} {'ratio':>7}")
+    for row in new["results"]:
+        before = old.get((row["scale"], row["name"]))
+        if before is None or not before["median_ms"]:
+            continue
+        ratio = row["median_ms"] / before["median_ms"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{row['scale']:>10}  {row['name']:<34} {before['median_ms']:>10.3f} {row['median_ms']:>10.3f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the library and hotel data layers")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="rows per table; 1000 to 10000000")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per read operation")
+    parser.add_argument("--ops", type=int, default=200, help="calls per write operation")
+    parser.add_argument("--only", choices=["library", "hotel"], help="benchmark one system")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown counted as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = Results()
+    cwd = os.getcwd()
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                if args.only != "hotel":
+                    bench_library(results, scale, tmp, args.repeat, args.ops)
+                if args.only != "library":
+                    bench_hotel(results, scale, tmp, args.repeat, args.ops)
+            finally:
+                os.chdir(cwd)
+
+    report = {
+        "meta": {"commit": git_commit(), "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                 "platform": platform.platform(), "repeat": args.repeat, "ops": args.ops,
+                 "headless": "tkinter" not in sys.modules},
+        "results": results.rows,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.out}")
+    if args.compare and compare(args.compare, report, args.threshold):
+        raise SystemExit("performance regressions found")
+
+
+if __name__ == "__main__":
+    main()
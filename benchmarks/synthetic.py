@@ -0,0 +1,154 @@
+import argparse
+import csv
+import datetime
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from analytics import rebuild_daily_stats
+from catalog import bulk_changes
+from library_search import bulk_indexing
+from migrations import HOTEL_MIGRATIONS, LIBRARY_MIGRATIONS, migrate
+
+# Synthetic books, rooms, guests and bookings at any scale. Everything is
+# generated lazily from a seeded RNG, so the same seed gives the same data and
+# 10^7 rows never sit in memory at once.
+#   python benchmarks/synthetic.py --books 1000000 --books-db books.db
+#   python benchmarks/synthetic.py --bookings 100000 --hotel-db hotel.db
+#   python benchmarks/synthetic.py --books 5000 --csv books.csv
+
+SYLLABLES = ["ka", "lo", "mir", "sen", "ta", "vor", "el", "dun", "ri", "gal", "os", "ben", "qu", "ar", "li", "zo"]
+WORDS = ["shadow", "river", "garden", "empire", "winter", "secret", "stone", "night", "silver",
+         "mountain", "ocean", "crown", "forest", "dragon", "letter", "harbor", "glass", "storm",
+         "journey", "kingdom", "whisper", "lantern", "orchard", "memory", "compass", "falcon"]
+WORDS += [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+FIRST = ["Anna", "James", "Mei", "Omar", "Lucia", "Peter", "Aisha", "Tomas", "Ingrid", "Ravi"]
+LAST = ["Rowling", "Tolkien", "Austen", "Orwell", "Achebe", "Murakami", "Morrison", "Eco", "Lee", "Rao"]
+LAST += [a + b for a in SYLLABLES for b in SYLLABLES]
+
+ROOM_TYPES = [("Single", 80.0), ("Double", 120.0), ("Suite", 300.0)]
+BOOKINGS_START = datetime.date(2023, 1, 1)
+BATCH = 50000
+
+
+def isbn13(rng):
+    digits = "978" + f"{rng.randrange(10**9):09d}"
+    check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    return digits + str(check)
+
+
+def book_rows(count, seed=42):
+    """(title, author, year, isbn) tuples."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield (" ".join(rng.sample(WORDS, 3)).title(), f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+               rng.randint(1800, 2024), isbn13(rng))
+
+
+def room_rows(count, seed=42):
+    """(room_number, room_type, price) tuples; room numbers start at 101."""
+    rng = random.Random(seed)
+    for number in range(101, 101 + count):
+        room_type, price = rng.choice(ROOM_TYPES)
+        yield number, room_type, price
+
+
+def guest_rows(count, seed=42):
+    """(name, phone, email) tuples."""
+    rng = random.Random(seed)
+    for n in range(count):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        yield f"{first} {last}", f"+1555{rng.randrange(10**7):07d}", f"{first}.{last}{n}@example.com".lower()
+
+
+def booking_rows(count, rooms, guests, seed=42):
+    """(room_number, guest_id, check_in, check_out) tuples, never overlapping within a room.
+
+    Stays are laid out room by room from BOOKINGS_START, count // rooms per room,
+    so the last stay ends roughly count // rooms * 6 days later.
+    """
+    rng = random.Random(seed)
+    per_room, extra = divmod(count, rooms)
+    for index, room in enumerate(range(101, 101 + rooms)):
+        day = BOOKINGS_START + datetime.timedelta(days=rng.randint(0, 3))
+        for _ in range(per_room + (index < extra)):
+            nights = rng.randint(1, 5)
+            check_out = day + datetime.timedelta(days=nights)
+            yield room, rng.randint(1, guests), day.isoformat(), check_out.isoformat()
+            day = check_out + datetime.timedelta(days=rng.randint(0, 2))
+
+
+def hotel_scale(bookings):
+    """(rooms, guests) sized for a given number of bookings."""
+    return max(10, bookings // 100), max(10, bookings // 10)
+
+
+def insert_batches(conn, sql, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def populate_library(conn, count, seed=42):
+    migrate(conn, LIBRARY_MIGRATIONS)
+    with bulk_indexing(conn), bulk_changes(conn):
+        insert_batches(conn, "INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", book_rows(count, seed))
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def populate_hotel(conn, bookings, rooms=None, guests=None, seed=42):
+    default_rooms, default_guests = hotel_scale(bookings)
+    rooms, guests = rooms or default_rooms, guests or default_guests
+    migrate(conn, HOTEL_MIGRATIONS)
+    insert_batches(conn, "INSERT INTO rooms (room_number, room_type, price) VALUES (?, ?, ?)", room_rows(rooms, seed))
+    insert_batches(conn, "INSERT INTO guests (name, phone, email) VALUES (?, ?, ?)", guest_rows(guests, seed))
+    insert_batches(conn, "INSERT INTO bookings (room_number, guest_id, check_in_date, check_out_date) VALUES (?, ?, ?, ?)",
+                   booking_rows(bookings, rooms, guests, seed))
+    rebuild_daily_stats(conn)  # the rows above bypass the booking functions that keep it current
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+    return rooms, guests
+
+
+def write_books_csv(path, count, seed=42):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "author", "year", "isbn"])
+        writer.writerows(book_rows(count, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic library and hotel data")
+    parser.add_argument("--books", type=int, default=0, help="number of books")
+    parser.add_argument("--bookings", type=int, default=0, help="number of bookings (rooms and guests scale with it)")
+    parser.add_argument("--books-db", help="write the books into this database")
+    parser.add_argument("--hotel-db", help="write rooms, guests and bookings into this database")
+    parser.add_argument("--csv", help="write the books as an importable CSV file")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.books and args.csv:
+        write_books_csv(args.csv, args.books, args.seed)
+        print(f"{args.csv}: {args.books} books")
+    if args.books and args.books_db:
+        with sqlite3.connect(args.books_db) as conn:
+            populate_library(conn, args.books, args.seed)
+        print(f"{args.books_db}: {args.books} books")
+    if args.bookings and args.hotel_db:
+        with sqlite3.connect(args.hotel_db) as conn:
+            rooms, guests = populate_hotel(conn, args.bookings, seed=args.seed)
+        print(f"{args.hotel_db}: {rooms} rooms, {guests} guests, {args.bookings} bookings")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# ---------- Read-through cache for query results ----------
+# A byte-bounded LRU shared by every thread of one app. Keys are tuples whose
+# first item names the kind of entry ("search", "room", "rooms page", ...), so
+# a write path can drop just the kinds it affects. Writes made by other
+# processes are caught through PRAGMA data_version, which changes whenever
+# another connection commits to the file: check(conn) clears the cache then.
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+MISSING = object()
+
+
+def sizeof(value):
+    """Rough memory footprint of a cached value: rows, lists of rows and scalars."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(sizeof(item) for item in value)
+    return size
+
+
+class QueryCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size), least recently used first
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.bytes = 0
+        self.generation = 0  # bumped by invalidate()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, generation=None):
+        size = sizeof(key) + sizeof(value)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return value  # loaded before an invalidation, may already be stale
+            if size > self.max_bytes:
+                return value  # larger than the whole cache: serve it uncached
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            self._evict()
+        return value
+
+    def get_or_load(self, key, load, *args):
+        generation = self.generation
+        value = self.get(key)
+        if value is MISSING:
+            value = self.put(key, load(*args), generation)
+        return value
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def invalidate(self, *kinds):
+        """Drop the entries of the given kinds, or everything when none are given."""
+        with self._lock:
+            if not kinds:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if key[0] in kinds]
+            for key in keys:
+                self.bytes -= self._entries.pop(key)[1]
+            self.generation += 1
+            self.invalidations += 1
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+            self.generation += 1
+
+    def check(self, conn):
+        """Clear the cache if another connection has committed since this thread last looked."""
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        seen = getattr(self._local, "versions", None)
+        if seen is None:
+            seen = self._local.versions = {}
+        if seen.get(id(conn)) != version:
+            if id(conn) in seen or self._entries:
+                self.invalidate()
+            seen[id(conn)] = version
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions, "invalidations": self.invalidations}
@@ -0,0 +1,392 @@
+import array
+import bisect
+import itertools
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from db import PAGE_SIZE
+from exporter import FETCH_SIZE, export_batches
+from library_search import TOKEN_RE, fold, isbn_prefix_range, normalise_isbn_query, row_matches
+
+# ---------- Read-only catalog snapshot for kiosks ----------
+# A kiosk only browses and searches, so instead of SQLite it reads a snapshot
+# file of the books table laid out column by column: ids and years as packed
+# integer arrays, titles and ISBNs as one UTF-8 blob each plus offsets, every
+# distinct author stored once, the rows sorted by ISBN for binary search and
+# grouped by author. The file is memory-mapped, so opening it costs the same
+# at any size and every kiosk process on a machine shares the same pages.
+#
+# Writes to books bump catalog_version.changes (triggers below). Catalog checks
+# the counter every CHECK_SECONDS and builds a new snapshot when it moved.
+#   python main.py --kiosk
+#   python catalog.py --db books.db     # build or refresh the snapshot
+
+CHANGES_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS catalog_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        token INTEGER NOT NULL,  -- random per database, so a replaced books.db never matches an old snapshot
+        changes INTEGER NOT NULL)""",
+    "INSERT OR IGNORE INTO catalog_version VALUES (1, random() & 9223372036854775807, 0)",
+    """CREATE TRIGGER IF NOT EXISTS books_changes_ai AFTER INSERT ON books BEGIN
+        UPDATE catalog_version SET changes = changes + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_changes_ad AFTER DELETE ON books BEGIN
+        UPDATE catalog_version SET changes = changes + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_changes_au AFTER UPDATE ON books BEGIN
+        UPDATE catalog_version SET changes = changes + 1;
+    END""",
+]
+
+CHECK_SECONDS = 5.0
+READ_ONLY = "The kiosk catalog is read-only."
+
+MAGIC = b"BOOKSNP" + (b"L" if sys.byteorder == "little" else b"B")  # arrays are in native byte order
+FORMAT = 1
+YEAR_NONE = -2 ** 31
+WORD_BYTES = frozenset(b"0123456789abcdefghijklmnopqrstuvwxyz_")  # folded titles are lowercase
+HEADER = struct.Struct("<8sIIqqqq")  # magic, format, sections, token, changes, rows, authors
+SECTIONS = [
+    ("ids", "q"), ("years", "i"), ("author_index", "I"),
+    ("title_offsets", "Q"), ("titles", "B"),
+    ("folded_offsets", "Q"), ("folded", "B"),  # "\n" + fold(title) per row, scanned by the title search
+    ("isbn_offsets", "Q"), ("isbns", "B"), ("isbn_order", "I"), ("year_order", "I"),
+    ("author_offsets", "Q"), ("authors", "B"), ("author_rows", "I"), ("author_starts", "I"),
+]
+TABLE = struct.Struct("<" + "QQ" * len(SECTIONS))  # (offset, length) per section
+
+
+def change_count(conn):
+    """(token, changes) of books.db; the snapshot is current while both match."""
+    return conn.execute("SELECT token, changes FROM catalog_version").fetchone()
+
+
+@contextmanager
+def bulk_changes(conn):
+    """Count the rows inserted into books inside the block as one change.
+
+    Like bulk_indexing: the per-row books_changes_ai trigger more than doubles
+    the cost of a bulk insert, so it is dropped for the duration and restored
+    in the caller's transaction.
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='books_changes_ai'").fetchone() is None:
+        yield
+        return
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute("DROP TRIGGER books_changes_ai")
+    yield
+    conn.execute("UPDATE catalog_version SET changes = changes + 1")
+    conn.execute(CHANGES_SCHEMA[2])  # recreate books_changes_ai
+
+
+def encode_texts(texts, separator=b""):
+    """(offsets array, blob) for a list of strings; offsets[i]:offsets[i + 1] is text i."""
+    offsets, blob = array.array("Q"), bytearray()
+    for text in texts:
+        blob += separator
+        offsets.append(len(blob))
+        blob += text.encode("utf-8")
+    offsets.append(len(blob))
+    return offsets, blob
+
+
+def build_snapshot(conn, path):
+    """Write a snapshot of the books table to `path`; returns the (token, changes) it reflects."""
+    conn.execute("BEGIN")  # the counter and the rows from one read transaction
+    try:
+        token, changes = change_count(conn)
+        ids, years, author_index = array.array("q"), array.array("i"), array.array("I")
+        titles, isbns, authors = [], [], {}
+        for book_id, title, author, year, isbn in conn.execute("SELECT id, title, author, year, isbn FROM books ORDER BY id"):
+            ids.append(book_id)
+            years.append(year if isinstance(year, int) and -2 ** 31 < year < 2 ** 31 else YEAR_NONE)
+            author_index.append(authors.setdefault(author or "", len(authors)))
+            titles.append(title or "")
+            isbns.append(isbn or "")
+    finally:
+        conn.rollback()
+
+    # Row positions grouped by author (ascending within each), by counting sort
+    author_starts = array.array("I", [0] * (len(authors) + 1))
+    for a in author_index:
+        author_starts[a + 1] += 1
+    for a in range(len(authors)):
+        author_starts[a + 1] += author_starts[a]
+    author_rows, filled = array.array("I", [0] * len(ids)), array.array("I", author_starts[:-1])
+    for position, a in enumerate(author_index):
+        author_rows[filled[a]] = position
+        filled[a] += 1
+
+    sections = {"ids": ids, "years": years, "author_index": author_index,
+                "isbn_order": array.array("I", sorted(range(len(isbns)), key=isbns.__getitem__)),
+                "year_order": array.array("I", sorted(range(len(years)), key=years.__getitem__)),
+                "author_rows": author_rows, "author_starts": author_starts}
+    sections["title_offsets"], sections["titles"] = encode_texts(titles)
+    sections["folded_offsets"], sections["folded"] = encode_texts(map(fold, titles), b"\n")
+    sections["isbn_offsets"], sections["isbns"] = encode_texts(isbns)
+    sections["author_offsets"], sections["authors"] = encode_texts(authors)
+
+    table, offset = [], HEADER.size + TABLE.size
+    with open(path, "wb") as f:
+        f.write(b"\0" * offset)
+        for name, _ in SECTIONS:
+            data = memoryview(sections[name])
+            padding = -offset % 8  # keep every array 8-byte aligned
+            f.write(b"\0" * padding)
+            offset += padding
+            table += [offset, data.nbytes]
+            f.write(data)
+            offset += data.nbytes
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT, len(SECTIONS), token, changes, len(ids), len(authors)))
+        f.write(TABLE.pack(*table))
+    return token, changes
+
+
+class CatalogSnapshot:
+    """A memory-mapped snapshot: rows are decoded only when asked for."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, fmt, sections, self.token, self.changes, self.count, authors = HEADER.unpack_from(view)
+        if magic != MAGIC or fmt != FORMAT or sections != len(SECTIONS):
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{path} is not a catalog snapshot of this format")
+        table = TABLE.unpack_from(view, HEADER.size)
+        self._views = [view]
+        for i, (name, code) in enumerate(SECTIONS):
+            section = view[table[2 * i]:table[2 * i] + table[2 * i + 1]].cast(code)
+            self._views.append(section)
+            setattr(self, name, section)
+        # Distinct authors are few next to the rows: decoded once and interned
+        self.author_names = [sys.intern(self.text(self.author_offsets, self.authors, a)) for a in range(authors)]
+        self._author_words = None
+
+    @staticmethod
+    def text(offsets, blob, i):
+        return str(blob[offsets[i]:offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return self.count
+
+    def row(self, i):
+        year = self.years[i]
+        return (self.ids[i], self.text(self.title_offsets, self.titles, i), self.author_names[self.author_index[i]],
+                None if year == YEAR_NONE else year, self.text(self.isbn_offsets, self.isbns, i))
+
+    def get(self, book_id):
+        i = bisect.bisect_left(self.ids, int(book_id))
+        return self.row(i) if i < self.count and self.ids[i] == int(book_id) else None
+
+    def view(self):
+        return [self.row(i) for i in range(self.count)]
+
+    def view_page(self, after=None, before=None, limit=PAGE_SIZE):
+        # Same contract as keyset_sql: pages before a key come back descending
+        if before is not None:
+            end = bisect.bisect_left(self.ids, int(before))
+            return [self.row(i) for i in range(end - 1, max(end - limit, 0) - 1, -1)]
+        start = bisect.bisect_right(self.ids, int(after)) if after is not None else 0
+        return [self.row(i) for i in range(start, min(start + limit, self.count))]
+
+    def search(self, title="", author="", year="", isbn="", limit=None):
+        """Same matching as library_search (word prefixes, ISBN prefix, exact year), in id order."""
+        return list(itertools.islice(self.matches(title, author, year, isbn), limit or None))
+
+    def matches(self, title="", author="", year="", isbn=""):
+        """The rows search() returns, decoded one at a time as they are consumed."""
+        candidates = None  # row positions that can still match; None means every row
+        prefix = normalise_isbn_query(isbn) if isbn else ""
+        if prefix:
+            candidates = self.isbn_positions(prefix)
+        author_terms = TOKEN_RE.findall(fold(author)) if author else []
+        if author_terms:
+            candidates = narrowed(candidates, self.author_positions(author_terms))
+        title_terms = TOKEN_RE.findall(fold(title)) if title else []
+        if title_terms:
+            candidates = narrowed(candidates, self.title_positions(max(title_terms, key=len)))
+        if str(year).strip():
+            try:
+                wanted = int(str(year).strip())
+            except ValueError:
+                return
+            candidates = narrowed(candidates, self.year_positions(wanted))
+
+        for i in range(self.count) if candidates is None else sorted(candidates):
+            row = self.row(i)
+            # Only the title lookup can over-match (it uses one term, and sees
+            # non-ASCII letters as word breaks); row_matches is exact
+            if not title_terms or row_matches(row, title, author, isbn):
+                yield row
+
+    def bound(self, key, value):
+        """First k with key(k) >= value, key being ascending over 0..count."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if key(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def isbn_positions(self, prefix):
+        def isbn(k):
+            return self.text(self.isbn_offsets, self.isbns, self.isbn_order[k])
+        low, high = isbn_prefix_range(prefix)
+        return set(self.isbn_order[self.bound(isbn, low):self.bound(isbn, high)])
+
+    def year_positions(self, wanted):
+        def year(k):
+            return self.years[self.year_order[k]]
+        return set(self.year_order[self.bound(year, wanted):self.bound(year, wanted + 1)])
+
+    def author_positions(self, terms):
+        if self._author_words is None:
+            self._author_words = [TOKEN_RE.findall(fold(name)) for name in self.author_names]
+        positions = set()
+        for a, words in enumerate(self._author_words):
+            if all(any(word.startswith(term) for word in words) for term in terms):
+                positions.update(self.author_rows[self.author_starts[a]:self.author_starts[a + 1]])
+        return positions
+
+    def title_positions(self, term):
+        # Rows with a word starting with `term`: a literal scan of the mapped
+        # folded titles (fast in re), keeping hits that don't follow a letter
+        pattern = re.compile(re.escape(term.encode("utf-8")))
+        folded, offsets = self.folded, self.folded_offsets
+        return {bisect.bisect_right(offsets, match.start()) - 1 for match in pattern.finditer(folded)
+                if folded[match.start() - 1] not in WORD_BYTES}
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+
+def narrowed(candidates, positions):
+    return positions if candidates is None else candidates & positions
+
+
+class Catalog:
+    """library_data's read functions served from a snapshot of books.db; writes raise ValueError."""
+
+    def __init__(self, db="books.db", check_seconds=CHECK_SECONDS):
+        self.db = db
+        self.base = os.path.splitext(db)[0]  # snapshots are <base>.<token>.<changes>.snapshot
+        self.check_seconds = check_seconds
+        self.snapshot = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot_path(self, token, changes):
+        return f"{self.base}.{token:x}.{changes}.snapshot"
+
+    def connect(self):
+        from library_data import connect
+        connect(self.db, seed=False)  # schema and change counter, as the admin app does
+        self.refresh()
+
+    def refresh(self):
+        """Load the snapshot for the current books.db, building it if needed; True when it changed."""
+        with self._lock:
+            self._checked = time.monotonic()
+            conn = sqlite3.connect(self.db)
+            try:
+                current = tuple(change_count(conn))
+                if self.snapshot is not None and (self.snapshot.token, self.snapshot.changes) == current:
+                    return False
+                path = self.snapshot_path(*current)
+                try:
+                    snapshot = CatalogSnapshot(path)
+                except (OSError, ValueError):  # not built yet, or by an older version
+                    snapshot = CatalogSnapshot(self.build(conn))
+            finally:
+                conn.close()
+            self.snapshot = snapshot  # the old one is unmapped once nothing uses it
+        self.remove_stale()
+        return True
+
+    def build(self, conn):
+        temp = f"{self.base}.{os.getpid()}.{threading.get_ident()}.tmp"
+        path = self.snapshot_path(*build_snapshot(conn, temp))
+        try:
+            os.replace(temp, path)
+        except OSError:
+            # Windows: another kiosk built and mapped the same snapshot meanwhile
+            os.remove(temp)
+        return path
+
+    def remove_stale(self):
+        folder, stem = os.path.split(self.base)
+        for name in os.listdir(folder or "."):
+            path = os.path.join(folder, name)
+            if name.startswith(stem + ".") and name.endswith(".snapshot") and path != self.snapshot.path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # still mapped by a kiosk on Windows; removed on a later refresh
+
+    def current(self):
+        if self.snapshot is None or time.monotonic() - self._checked >= self.check_seconds:
+            self.refresh()
+        return self.snapshot
+
+    # ----- library_data interface -----
+    def view(self):
+        return self.current().view()
+
+    def view_page(self, after=None, before=None, limit=PAGE_SIZE):
+        return self.current().view_page(after, before, limit)
+
+    def search(self, title="", author="", year="", isbn="", limit=None):
+        return self.current().search(title, author, year, isbn, limit)
+
+    def insert(self, title, author, year, isbn):
+        raise ValueError(READ_ONLY)
+
+    def update(self, book_id, title, author, year, isbn):
+        raise ValueError(READ_ONLY)
+
+    def delete(self, book_id):
+        raise ValueError(READ_ONLY)
+
+    def import_job(self, file_path, task):
+        raise ValueError(READ_ONLY)
+
+    def export_job(self, file_path, filters, task):
+        # Rows are decoded a batch at a time from the mapped file, like export_query's fetchmany
+        rows = self.current().matches(*(filters or ()))
+        batches = iter(lambda: list(itertools.islice(rows, FETCH_SIZE)), [])
+        export_batches(["ID", "Title", "Author", "Year", "ISBN"], batches, file_path, task.progress)
+        return file_path
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Build or refresh the kiosk snapshot of books.db")
+    parser.add_argument("--db", default="books.db")
+    args = parser.parse_args()
+
+    catalog = Catalog(args.db)
+    start = time.perf_counter()
+    catalog.connect()
+    snapshot = catalog.snapshot
+    print(f"{snapshot.path}: {len(snapshot)} books, {len(snapshot.author_names)} authors, "
+          f"{os.path.getsize(snapshot.path) / 1024 / 1024:.1f} MB, {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
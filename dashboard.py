@@ -0,0 +1,129 @@
+import datetime
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from hotel_import import ROOM_TYPES
+
+# ---------- Occupancy and revenue dashboard ----------
+# Per room type occupancy, average daily rate, RevPAR and revenue over a date
+# range, with the nightly occupancy drawn underneath. The numbers come from
+# occupancy_report(start, end, room_type), which reads the daily aggregates,
+# and run on the TaskRunner like every other query.
+
+DEFAULT_DAYS = 30
+CHART_HEIGHT = 160
+CHART_PAD = 30
+
+COLUMNS = [("room_type", "Room Type", 120), ("rooms", "Rooms", 70), ("room_nights", "Room-nights", 100),
+           ("occupancy", "Occupancy", 90), ("adr", "ADR", 90), ("revpar", "RevPAR", 90), ("revenue", "Revenue", 120)]
+
+
+def formatted(name, value):
+    if name == "occupancy":
+        return f"{value:.1%}"
+    if name in ("adr", "revpar", "revenue"):
+        return f"{value:,.2f}"
+    if isinstance(value, (int, float)):
+        return f"{value:,.0f}"
+    return value
+
+
+class AnalyticsWindow:
+    def __init__(self, root, runner, report):
+        self.runner = runner
+        self.report = report
+        self.result = None
+        self.window = tk.Toplevel(root)
+        self.window.title("Occupancy and Revenue")
+        self.window.geometry("760x480")
+
+        today = datetime.date.today()
+        form = ttk.Frame(self.window)
+        form.pack(fill="x", padx=10, pady=10)
+        self.start_var = tk.StringVar(value=(today - datetime.timedelta(days=DEFAULT_DAYS - 1)).isoformat())
+        self.end_var = tk.StringVar(value=today.isoformat())
+        self.type_var = tk.StringVar()
+        for column, (label, widget) in enumerate([
+                ("From", ttk.Entry(form, textvariable=self.start_var, width=12)),
+                ("To", ttk.Entry(form, textvariable=self.end_var, width=12)),
+                ("Room Type", ttk.Combobox(form, textvariable=self.type_var, values=[""] + list(ROOM_TYPES), width=10))]):
+            ttk.Label(form, text=label).grid(row=0, column=2 * column, padx=5, sticky="e")
+            widget.grid(row=0, column=2 * column + 1, padx=5, sticky="w")
+        ttk.Button(form, text="Show", command=self.refresh).grid(row=0, column=6, padx=10)
+        self.status = ttk.Label(form, text="")
+        self.status.grid(row=0, column=7, padx=5, sticky="w")
+
+        self.tree = ttk.Treeview(self.window, columns=[name for name, _, _ in COLUMNS], show="headings", height=5)
+        for name, heading, width in COLUMNS:
+            self.tree.heading(name, text=heading)
+            self.tree.column(name, width=width, anchor="w" if name == "room_type" else "e")
+        self.tree.pack(fill="x", padx=10)
+
+        ttk.Label(self.window, text="Occupancy per night").pack(anchor="w", padx=10, pady=(10, 0))
+        self.chart = tk.Canvas(self.window, height=CHART_HEIGHT, bg="white", highlightthickness=0)
+        self.chart.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.chart.bind("<Configure>", lambda event: self.draw_chart())
+        self.refresh()
+
+    def refresh(self):
+        self.status.configure(text="Loading...")
+        started = datetime.datetime.now()
+
+        def done(result):
+            if not self.exists():  # closed while the report was loading
+                return
+            elapsed = (datetime.datetime.now() - started).total_seconds() * 1000
+            self.status.configure(text=f"{len(result['days'])} nights in {elapsed:.0f} ms")
+            self.show(result)
+
+        def failed(error):
+            if not self.exists():
+                return
+            self.status.configure(text="")
+            self.runner.notify(self.show_error, error)
+        self.runner.submit(self.report, self.start_var.get(), self.end_var.get(), self.type_var.get() or None,
+                           on_done=done, on_error=failed)
+
+    def show_error(self, error):
+        if self.exists():
+            messagebox.showerror("Error", str(error), parent=self.window)
+
+    def show(self, result):
+        self.result = result
+        self.tree.delete(*self.tree.get_children())
+        for row in result["rows"] + [result["total"]]:
+            self.tree.insert("", tk.END, values=[formatted(name, row[name]) for name, _, _ in COLUMNS])
+        self.draw_chart()
+
+    def draw_chart(self):
+        self.chart.delete("all")
+        if not self.result or not self.result["days"]:
+            return
+        width, height = self.chart.winfo_width(), self.chart.winfo_height()
+        left, bottom, top = CHART_PAD, height - CHART_PAD / 2, CHART_PAD / 2
+        right = width - CHART_PAD / 2
+        self.chart.create_line(left, bottom, right, bottom, fill="#999")
+        self.chart.create_line(left, bottom, left, top, fill="#999")
+        self.chart.create_text(left - 4, top, text="100%", anchor="e", font=("Arial", 8))
+        self.chart.create_text(left - 4, bottom, text="0%", anchor="e", font=("Arial", 8))
+        days, occupancy = self.result["days"], self.result["occupancy"]
+        self.chart.create_text(left, bottom + 2, text=days[0], anchor="nw", font=("Arial", 8))
+        self.chart.create_text(right, bottom + 2, text=days[-1], anchor="ne", font=("Arial", 8))
+        # At most one point per pixel column: long ranges are averaged into buckets
+        buckets = max(1, min(len(occupancy), int(right - left)))
+        size = len(occupancy) / buckets
+        points = []
+        for i in range(buckets):
+            chunk = occupancy[int(i * size):max(int((i + 1) * size), int(i * size) + 1)]
+            x = left + (right - left) * (i / max(buckets - 1, 1))
+            points += [x, bottom - (bottom - top) * min(sum(chunk) / len(chunk), 1.0)]
+        if len(points) == 2:
+            points += [right, points[1]]
+        self.chart.create_line(*points, fill="#007acc", width=2)
+
+    def lift(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def exists(self):
+        return bool(self.window.winfo_exists())
@@ -0,0 +1,125 @@
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# ---------- Shared data-access layer ----------
+# One long-lived connection per thread instead of sqlite3.connect() per call.
+# sqlite3 keeps an LRU of compiled statements per connection (keyed by the SQL
+# text), so reusing both the connection and constant SQL strings means hot
+# statements are prepared once and then only re-bound.
+
+STATEMENT_CACHE_SIZE = 256
+PAGE_SIZE = 200
+BUSY_TIMEOUT = 2.0   # seconds sqlite3 itself waits for a lock before reporting SQLITE_BUSY
+BUSY_RETRIES = 6     # further attempts made by Database.immediate(), with backoff
+BUSY_BACKOFF = 0.02  # first backoff in seconds, doubled on each retry
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",      # readers don't block the writer
+    "synchronous": "NORMAL",    # safe with WAL, far fewer fsyncs than FULL
+    "cache_size": -16000,       # KiB of page cache per connection
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+class Database:
+    def __init__(self, path, pragmas=None, cached_statements=STATEMENT_CACHE_SIZE, factory=sqlite3.Connection):
+        self.path = path
+        self.pragmas = dict(DEFAULT_PRAGMAS, **(pragmas or {}))
+        self.cached_statements = cached_statements
+        self.factory = factory  # connection class, e.g. instrumentation.ProfiledConnection
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._generation = 0  # bumped by set_pragmas so every thread re-applies them
+
+    def set_pragmas(self, **pragmas):
+        with self._lock:
+            self.pragmas.update(pragmas)
+            self._generation += 1
+
+    def _apply_pragmas(self, conn):
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        self._local.generation = self._generation
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, factory=self.factory,
+                                   cached_statements=self.cached_statements)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+            self._apply_pragmas(conn)
+        elif self._local.generation != self._generation:
+            self._apply_pragmas(conn)
+        return conn
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def immediate(self, fn, *args, retries=BUSY_RETRIES):
+        """Run fn(conn, *args) in a BEGIN IMMEDIATE transaction and return its result.
+
+        The write lock is held before fn reads anything, so its checks and writes
+        are atomic across connections and processes. Retried with backoff while
+        the database stays locked; any other error rolls back and propagates.
+        """
+        conn = self.connection()
+        for attempt in range(retries + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                result = fn(conn, *args)
+                conn.commit()
+                return result
+            except sqlite3.OperationalError as e:
+                conn.rollback()
+                if not is_busy(e) or attempt == retries:
+                    raise
+            except BaseException:
+                conn.rollback()
+                raise
+            time.sleep(BUSY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def close(self):
+        """Close every thread's connection (call once the app is shutting down)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # created in another thread that is still alive
+        self._local = threading.local()
+
+
+def is_busy(error):
+    # SQLITE_BUSY / SQLITE_LOCKED; the message is all older Pythons expose
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def keyset_sql(table, key, after=None, before=None, limit=PAGE_SIZE, columns="*"):
+    """SQL for one page of `table` ordered by `key`; pages before a key come back descending."""
+    if before is not None:
+        return f"SELECT {columns} FROM {table} WHERE {key} < ? ORDER BY {key} DESC LIMIT ?", (before, limit)
+    if after is not None:
+        return f"SELECT {columns} FROM {table} WHERE {key} > ? ORDER BY {key} LIMIT ?", (after, limit)
+    return f"SELECT {columns} FROM {table} ORDER BY {key} LIMIT ?", (limit,)
@@ -0,0 +1,146 @@
+import datetime
+import tkinter as tk
+from tkinter import ttk
+
+from instrumentation import LOG_FILE, profiler
+
+# ---------- Diagnostics window ----------
+# Shows what the profiler has recorded in this process: per-statement latency,
+# rows, VM steps and query plan, the timed UI callbacks and background tasks,
+# and the most recent SQL. Refreshes itself every REFRESH_MS while open.
+
+REFRESH_MS = 1000
+
+QUERY_COLUMNS = [("name", "Statement", 420), ("calls", "Calls", 60), ("total_ms", "Total ms", 80),
+                 ("avg_ms", "Avg ms", 70), ("max_ms", "Max ms", 70), ("rows", "Rows", 70),
+                 ("steps", "Steps", 60), ("full_scan", "Full scan", 70)]
+SPAN_COLUMNS = [("name", "Operation", 300), ("calls", "Calls", 60), ("total_ms", "Total ms", 90),
+                ("avg_ms", "Avg ms", 80), ("max_ms", "Max ms", 80)]
+RECENT_COLUMNS = [("time", "Time", 100), ("thread", "Thread", 140), ("sql", "SQL", 560)]
+
+
+def cell(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, bool):
+        return "yes" if value else ""
+    return " ".join(str(value).split())
+
+
+class DiagnosticsWindow:
+    """frames is a tasks.FrameMonitor, cache_stats a function returning QueryCache.stats()."""
+
+    def __init__(self, root, frames=None, cache_stats=None):
+        self.frames = frames
+        self.cache_stats = cache_stats
+        self.plans = {}
+        self._iids = {}  # statement / span name -> Treeview item id, stable across refreshes
+        self._job = None
+        self.window = tk.Toplevel(root)
+        self.window.title("Diagnostics")
+        self.window.geometry("1000x560")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.summary = tk.Label(self.window, anchor="w", justify="left", font=("Arial", 10))
+        self.summary.pack(fill="x", padx=10, pady=(10, 5))
+
+        notebook = ttk.Notebook(self.window)
+        notebook.pack(fill="both", expand=True, padx=10)
+        queries = tk.Frame(notebook)
+        self.query_tree = self.table(queries, QUERY_COLUMNS)
+        self.query_tree.bind("<<TreeviewSelect>>", self.show_plan)
+        self.plan = tk.Text(queries, height=5, font=("Courier", 9))
+        self.plan.pack(fill="x", pady=(5, 0))
+        notebook.add(queries, text="Queries")
+        spans = tk.Frame(notebook)
+        self.span_tree = self.table(spans, SPAN_COLUMNS)
+        notebook.add(spans, text="UI and tasks")
+        recent = tk.Frame(notebook)
+        self.recent_tree = self.table(recent, RECENT_COLUMNS)
+        notebook.add(recent, text="Recent SQL")
+
+        buttons = tk.Frame(self.window)
+        buttons.pack(fill="x", padx=10, pady=10)
+        tk.Button(buttons, text="Refresh", command=self.refresh, width=10).pack(side="left")
+        tk.Button(buttons, text="Reset", command=self.reset, width=10).pack(side="left", padx=5)
+        tk.Label(buttons, text=f"Slow operations are logged to {LOG_FILE}").pack(side="right")
+        self.refresh()
+
+    @staticmethod
+    def table(parent, columns):
+        tree = ttk.Treeview(parent, columns=[name for name, _, _ in columns], show="headings")
+        for name, heading, width in columns:
+            tree.heading(name, text=heading)
+            tree.column(name, width=width, anchor="w" if name in ("name", "sql", "thread") else "e")
+        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        tree.pack(fill="both", expand=True)
+        return tree
+
+    def iid(self, kind, name):
+        return self._iids.setdefault((kind, name), str(len(self._iids)))
+
+    def fill(self, tree, columns, rows, kind=None):
+        # Keep the selection across refreshes when the row is still there
+        selected = tree.selection()
+        tree.delete(*tree.get_children())
+        for index, row in enumerate(rows):
+            iid = self.iid(kind, row["name"]) if kind else str(index)
+            tree.insert("", "end", iid=iid, values=[cell(row[name]) for name, _, _ in columns])
+        keep = [iid for iid in selected if tree.exists(iid)]
+        if keep:
+            tree.selection_set(keep)
+
+    def refresh(self):
+        if self._job is not None:
+            self.window.after_cancel(self._job)
+        snapshot = profiler.snapshot()
+        self.plans = {self.iid("query", row["name"]): row["plan"] for row in snapshot["queries"]}
+        self.fill(self.query_tree, QUERY_COLUMNS, snapshot["queries"], "query")
+        self.fill(self.span_tree, SPAN_COLUMNS, snapshot["spans"], "span")
+        recent = [{"time": datetime.datetime.fromtimestamp(row["time"]).strftime("%H:%M:%S.%f")[:-3],
+                   "thread": row["thread"], "sql": row["sql"]} for row in reversed(snapshot["recent"])]
+        self.fill(self.recent_tree, RECENT_COLUMNS, recent)
+        self.summary.configure(text=self.summary_text(snapshot))
+        self._job = self.window.after(REFRESH_MS, self.refresh)
+
+    def summary_text(self, snapshot):
+        queries = snapshot["queries"]
+        lines = [f"{sum(row['calls'] for row in queries)} statements, "
+                 f"{sum(row['total_ms'] for row in queries):.1f} ms in SQLite, "
+                 f"{sum(row['full_scan'] for row in queries)} distinct statements with a full table scan"]
+        if self.frames is not None:
+            frames = self.frames.stats()
+            lines.append(f"Frame latency: avg {frames['avg_ms']:.1f} ms, max {frames['max_ms']:.1f} ms "
+                         f"over the last {frames['frames']} frames")
+        if self.cache_stats is not None:
+            cache = self.cache_stats()
+            lines.append(f"Query cache: {cache['hit_rate']:.0%} hits ({cache['hits']}/{cache['hits'] + cache['misses']}), "
+                         f"{cache['entries']} entries, {cache['bytes'] / 1024:.0f} KB of {cache['max_bytes'] / 1024:.0f} KB")
+        return "\n".join(lines)
+
+    def show_plan(self, event=None):
+        selected = self.query_tree.selection()
+        self.plan.delete("1.0", tk.END)
+        if selected:
+            self.plan.insert(tk.END, "\n".join(self.plans.get(selected[0]) or ["(no plan recorded)"]))
+
+    def reset(self):
+        profiler.reset()
+        self._iids.clear()
+        self.plan.delete("1.0", tk.END)
+        self.refresh()
+
+    def lift(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def close(self):
+        if self._job is not None:
+            self.window.after_cancel(self._job)
+            self._job = None
+        self.window.destroy()
+
+    def exists(self):
+        return bool(self.window.winfo_exists())
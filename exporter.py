@@ -0,0 +1,98 @@
+import csv
+import json
+import os
+
+# ---------- Streaming export ----------
+# Rows are pulled from the cursor FETCH_SIZE at a time and written straight to
+# the file, so memory stays flat however large the table is. Parquet needs the
+# optional pyarrow package and is written one row group per batch.
+
+FETCH_SIZE = 5000
+
+EXPORT_FILETYPES = [("CSV Files", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")]
+
+
+def iter_batches(cursor, size=FETCH_SIZE):
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            break
+        yield rows
+
+
+def write_csv(columns, batches, path, on_progress):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in batches:
+            writer.writerows(rows)
+            count += len(rows)
+            on_progress(count)
+    return count
+
+
+def write_jsonl(columns, batches, path, on_progress):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for rows in batches:
+            f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in rows)
+            count += len(rows)
+            on_progress(count)
+    return count
+
+
+def write_parquet(columns, batches, path, on_progress):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow).")
+    count = 0
+    writer = None
+    try:
+        for rows in batches:
+            table = pa.table({name: [row[i] for row in rows] for i, name in enumerate(columns)})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            count += len(rows)
+            on_progress(count)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:  # no rows: still leave a valid file with the column names
+        pq.write_table(pa.table({name: pa.array([], pa.null()) for name in columns}), path)
+    return count
+
+
+WRITERS = {".csv": write_csv, ".jsonl": write_jsonl, ".parquet": write_parquet}
+
+
+def writer_for(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported export format {extension!r}; use .csv, .jsonl or .parquet.")
+    return WRITERS[extension]
+
+
+def export_batches(columns, batches, path, on_progress=None):
+    """Write an iterable of row batches to `path`; the format follows the file extension. Returns the row count."""
+    writer = writer_for(path)
+    try:
+        return writer(columns, batches, path, on_progress or (lambda n: None))
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)  # don't leave half-written exports behind (e.g. after Cancel)
+        raise
+
+
+def export_query(conn, sql, params, path, on_progress=None, columns=None, fetch_size=FETCH_SIZE):
+    """Stream the result of `sql` to `path` a batch at a time. Returns the row count."""
+    writer_for(path)
+    cursor = conn.execute(sql, params)
+    columns = columns or [description[0] for description in cursor.description]
+    try:
+        return export_batches(columns, iter_batches(cursor, fetch_size), path, on_progress)
+    finally:
+        cursor.close()
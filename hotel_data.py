@@ -0,0 +1,326 @@
+import datetime
+import threading
+from collections import Counter
+
+from analytics import record_stays, report
+from availability import (free_rooms, is_room_free, overlapping_bookings, refresh_all_rooms_status, refresh_room_status,
+                          refresh_rooms_status, validate_stay)
+from cache import QueryCache
+from db import PAGE_SIZE, Database, keyset_sql
+from exporter import export_query
+from hotel_import import batch_error, read_rooms_csv
+from migrations import HOTEL_MIGRATIONS, migrate
+
+# Hotel data layer. Everything here is GUI-independent: HotelManagementApp,
+# the HTTP API server (api_server.py) and scripts all call these functions.
+
+# Database setup
+# One connection per thread: the data functions below run on TaskRunner workers.
+# Nothing touches hotel.db at import; init_db() runs once the window is up.
+hotel_db = Database('hotel.db')
+# Room and guest rows and room pages, kept until a write touches them
+hotel_cache = QueryCache()
+
+
+def init_db():
+    # Create or upgrade the tables and indexes
+    migrate(hotel_db.connection(), HOTEL_MIGRATIONS)
+    refresh_status()
+
+
+# rooms.is_available means "not occupied tonight". Writes keep it current for
+# the rooms they touch; the first room page of each day (per database file)
+# recomputes it for every room, as stays begin and end overnight. The API
+# server reads with read_rooms_page() and refreshes through its writer thread.
+status_days = {}
+status_lock = threading.Lock()
+
+
+def refresh_status():
+    today = datetime.date.today()
+    with status_lock:
+        if status_days.get(hotel_db.path) == today:
+            return
+        hotel_db.immediate(refresh_all_rooms_status, today)
+        status_days[hotel_db.path] = today
+    rooms_changed()
+
+
+def fetch_rooms_page(after=None, before=None, limit=PAGE_SIZE):
+    refresh_status()
+    return read_rooms_page(after, before, limit)
+
+
+def read_rooms_page(after=None, before=None, limit=PAGE_SIZE):
+    conn = hotel_db.connection()
+    hotel_cache.check(conn)
+    return hotel_cache.get_or_load(("rooms page", after, before, limit),
+                                   lambda: conn.execute(*keyset_sql("rooms", "room_number", after, before, limit)).fetchall())
+
+
+def fetch_bookings_page(after=None, before=None, limit=PAGE_SIZE):
+    conn = hotel_db.connection()
+    c = conn.cursor()
+    c.execute(*keyset_sql("bookings", "booking_id", after, before, limit))
+    return c.fetchall()
+
+
+# --- Data operations ---
+# Each write returns the rows it changed so the views can apply them by key.
+def get_room(room_number):
+    conn = hotel_db.connection()
+    hotel_cache.check(conn)
+    return hotel_cache.get_or_load(("room", int(room_number)),
+                                   lambda: conn.execute("SELECT * FROM rooms WHERE room_number = ?", (room_number,)).fetchone())
+
+
+def get_guest(guest_id):
+    conn = hotel_db.connection()
+    hotel_cache.check(conn)
+    return hotel_cache.get_or_load(("guest", int(guest_id)),
+                                   lambda: conn.execute("SELECT * FROM guests WHERE guest_id = ?", (guest_id,)).fetchone())
+
+
+# Called after the commit, so no reader can re-cache the old row
+def room_changed(room_number):
+    hotel_cache.discard(("room", int(room_number)))
+    hotel_cache.invalidate("rooms page")
+
+
+def cache_stats():
+    return hotel_cache.stats()
+
+
+def insert_room(room_number, room_type, price):
+    with hotel_db.transaction() as conn:
+        conn.execute("INSERT INTO rooms (room_number, room_type, price) VALUES (?, ?, ?)",
+                     (room_number, room_type, price))
+    room_changed(room_number)
+    return get_room(room_number)
+
+
+def remove_room(room_number):
+    hotel_db.immediate(_remove_room, room_number)
+    room_changed(room_number)
+    return room_number
+
+
+def _remove_room(conn, room_number):
+    c = conn.cursor()
+    # Check if the room is currently booked
+    c.execute("SELECT * FROM bookings WHERE room_number = ?", (room_number,))
+    if c.fetchone():
+        raise ValueError("Cannot delete room. It is currently booked.")
+    c.execute("DELETE FROM rooms WHERE room_number = ?", (room_number,))
+
+
+def insert_guest(name, phone, email):
+    with hotel_db.transaction() as conn:
+        guest_id = conn.execute("INSERT INTO guests (name, phone, email) VALUES (?, ?, ?)",
+                                (name, phone, email)).lastrowid
+    hotel_cache.discard(("guest", guest_id))
+    return get_guest(guest_id)
+
+
+# Bookings are check-then-write, so each one runs inside hotel_db.immediate():
+# BEGIN IMMEDIATE takes the write lock before the overlap check, which makes
+# the check and the insert atomic even with several apps on one hotel.db.
+def book_room(room_number, guest_id, check_in_date, check_out_date):
+    """Create a booking; returns (booking row, updated room row)."""
+    check_in_date, check_out_date = validate_stay(check_in_date, check_out_date)
+    booking = hotel_db.immediate(_book_room, room_number, guest_id, check_in_date, check_out_date)
+    room_changed(room_number)
+    return booking, get_room(room_number)
+
+
+def _book_room(conn, room_number, guest_id, check_in_date, check_out_date):
+    c = conn.cursor()
+    # Check the room exists and no booking overlaps the requested dates.
+    # Room and guest rows come from the cache; check() inside the write lock
+    # has already dropped it if another process changed hotel.db.
+    if get_room(room_number) is None:
+        raise ValueError("Room not found.")
+    if not is_room_free(conn, room_number, check_in_date, check_out_date):
+        raise ValueError("Room is not available for these dates.")
+
+    # Check if the guest exists
+    if get_guest(guest_id) is None:
+        raise ValueError("Guest ID not found.")
+
+    # Create the booking
+    c.execute("INSERT INTO bookings (room_number, guest_id, check_in_date, check_out_date) VALUES (?, ?, ?, ?)",
+              (room_number, guest_id, check_in_date, check_out_date))
+    booking_id = c.lastrowid
+    record_stays(conn, [(room_number, check_in_date, check_out_date)])
+
+    # Update room availability
+    refresh_room_status(conn, room_number)
+
+    c.execute("SELECT * FROM bookings WHERE booking_id = ?", (booking_id,))
+    return c.fetchone()
+
+
+def cancel_booking(room_number, guest_id, check_in_date, check_out_date):
+    """Delete matching bookings; returns (deleted booking ids, updated room row).
+
+    Cancelling twice is harmless: the second call deletes nothing, returns no
+    ids and leaves the room untouched.
+    """
+    # Matched against the dates as book_room stored them
+    check_in_date, check_out_date = validate_stay(check_in_date, check_out_date)
+    booking_ids = hotel_db.immediate(_cancel_booking, room_number, guest_id, check_in_date, check_out_date)
+    if booking_ids:
+        room_changed(room_number)
+    return booking_ids, get_room(room_number)
+
+
+def _cancel_booking(conn, room_number, guest_id, check_in_date, check_out_date):
+    c = conn.cursor()
+    c.execute("SELECT booking_id FROM bookings WHERE room_number = ? AND guest_id = ? AND check_in_date = ? AND check_out_date = ?",
+              (room_number, guest_id, check_in_date, check_out_date))
+    booking_ids = [row[0] for row in c.fetchall()]
+
+    if booking_ids:
+        # Delete the booking
+        c.execute("DELETE FROM bookings WHERE room_number = ? AND guest_id = ? AND check_in_date = ? AND check_out_date = ?",
+                  (room_number, guest_id, check_in_date, check_out_date))
+        record_stays(conn, [(room_number, check_in_date, check_out_date)] * len(booking_ids), sign=-1)
+
+        # Update room availability, only when a booking was actually removed
+        refresh_room_status(conn, room_number)
+    return booking_ids
+
+
+# --- Batch operations ---
+# Room imports, group bookings and bulk check-outs each run as one BEGIN
+# IMMEDIATE transaction: every row is checked first, then written with
+# executemany. Any conflict raises ValueError before anything is written and
+# the whole batch rolls back. The caches are dropped once, after the commit.
+IN_CHUNK = 500  # values per IN (...) list, well under SQLite's parameter limit
+
+
+def select_in(conn, sql, values):
+    """Run sql, whose IN list is written {marks}, over values in chunks."""
+    values = list(values)
+    rows = []
+    for start in range(0, len(values), IN_CHUNK):
+        chunk = values[start:start + IN_CHUNK]
+        rows += conn.execute(sql.format(marks=", ".join("?" * len(chunk))), chunk).fetchall()
+    return rows
+
+
+def rooms_changed():
+    hotel_cache.invalidate("room", "rooms page")
+
+
+def insert_rooms(rooms):
+    """Add [(room_number, room_type, price)], all or none; returns the new room rows."""
+    rooms = [(int(number), room_type, float(price)) for number, room_type, price in rooms]
+    added = hotel_db.immediate(_insert_rooms, rooms)
+    rooms_changed()
+    return added
+
+
+def _insert_rooms(conn, rooms):
+    numbers = [room[0] for room in rooms]
+    errors = [f"room {number} is listed twice" for number, count in sorted(Counter(numbers).items()) if count > 1]
+    errors += [f"room {number} already exists" for number in
+               sorted(row[0] for row in select_in(conn, "SELECT room_number FROM rooms WHERE room_number IN ({marks})", numbers))]
+    if errors:
+        raise batch_error("No rooms added", errors)
+    conn.executemany("INSERT INTO rooms (room_number, room_type, price) VALUES (?, ?, ?)", rooms)
+    return sorted(select_in(conn, "SELECT * FROM rooms WHERE room_number IN ({marks})", numbers))
+
+
+def import_rooms_job(path, task):
+    rooms = insert_rooms(read_rooms_csv(path))
+    task.progress(len(rooms))
+    return rooms
+
+
+def book_rooms(stays):
+    """Create [(room_number, guest_id, check_in, check_out)] bookings, all or none.
+
+    Returns (new booking rows, updated room rows). A group booking is the same
+    guest and dates over several rooms.
+    """
+    stays = [(int(room), int(guest), *validate_stay(check_in, check_out)) for room, guest, check_in, check_out in stays]
+    if not stays:
+        raise ValueError("No bookings to create.")
+    result = hotel_db.immediate(_book_rooms, stays)
+    rooms_changed()
+    return result
+
+
+def _book_rooms(conn, stays):
+    room_numbers = sorted({stay[0] for stay in stays})
+    guest_ids = sorted({stay[1] for stay in stays})
+    found_rooms = {row[0] for row in select_in(conn, "SELECT room_number FROM rooms WHERE room_number IN ({marks})", room_numbers)}
+    found_guests = {row[0] for row in select_in(conn, "SELECT guest_id FROM guests WHERE guest_id IN ({marks})", guest_ids)}
+    errors = [f"room {n} not found" for n in room_numbers if n not in found_rooms]
+    errors += [f"guest {n} not found" for n in guest_ids if n not in found_guests]
+
+    # Stays of one room within the batch must not overlap each other either
+    previous = None
+    for room, _, check_in, check_out in sorted(stays, key=lambda stay: (stay[0], stay[2])):
+        if previous and previous[0] == room and previous[3] > check_in:
+            errors.append(f"room {room} is booked twice in this group ({previous[2]} and {check_in})")
+        previous = (room, None, check_in, check_out)
+    errors += [f"room {room} is not available from {check_in} to {check_out}"
+               for room, _, check_in, check_out in stays
+               if room in found_rooms and overlapping_bookings(conn, room, check_in, check_out)]
+    if errors:
+        raise batch_error("No bookings created", errors)
+
+    last_id = conn.execute("SELECT COALESCE(MAX(booking_id), 0) FROM bookings").fetchone()[0]
+    conn.executemany("INSERT INTO bookings (room_number, guest_id, check_in_date, check_out_date) VALUES (?, ?, ?, ?)", stays)
+    record_stays(conn, [(room, check_in, check_out) for room, _, check_in, check_out in stays])
+    refresh_rooms_status(conn, room_numbers)
+    bookings = conn.execute("SELECT * FROM bookings WHERE booking_id > ? ORDER BY booking_id", (last_id,)).fetchall()
+    return bookings, select_in(conn, "SELECT * FROM rooms WHERE room_number IN ({marks}) ORDER BY room_number", room_numbers)
+
+
+def check_out(booking_ids, day=None):
+    """End the given stays on `day` (today); returns (updated booking rows, updated room rows).
+
+    Stays that already ended are left as they are, so checking out twice is
+    harmless. A stay that has not started yet has to be deleted instead.
+    """
+    booking_ids = sorted({int(booking_id) for booking_id in booking_ids})
+    if not booking_ids:
+        raise ValueError("Please select the bookings to check out.")
+    result = hotel_db.immediate(_check_out, booking_ids, day or datetime.date.today())
+    rooms_changed()
+    return result
+
+
+def _check_out(conn, booking_ids, day):
+    today = day.isoformat()
+    bookings = {row[0]: row for row in select_in(conn, "SELECT * FROM bookings WHERE booking_id IN ({marks})", booking_ids)}
+    errors = [f"booking {n} not found" for n in booking_ids if n not in bookings]
+    errors += [f"booking {n} starts on {row[3]}, delete it instead" for n, row in bookings.items() if row[3] >= today]
+    if errors:
+        raise batch_error("Nobody checked out", errors)
+
+    shortened = [row for row in bookings.values() if row[4] > today]
+    conn.executemany("UPDATE bookings SET check_out_date = ? WHERE booking_id = ?", [(today, row[0]) for row in shortened])
+    record_stays(conn, [(row[1], today, row[4]) for row in shortened], sign=-1)  # the nights no longer stayed
+    room_numbers = sorted({row[1] for row in bookings.values()})
+    refresh_rooms_status(conn, room_numbers, day)
+    return (select_in(conn, "SELECT * FROM bookings WHERE booking_id IN ({marks}) ORDER BY booking_id", booking_ids),
+            select_in(conn, "SELECT * FROM rooms WHERE room_number IN ({marks}) ORDER BY room_number", room_numbers))
+
+
+def export_table(table, path, task):
+    # table is one of the fixed names passed by the Export buttons
+    return export_query(hotel_db.connection(), f"SELECT * FROM {table}", (), path, on_progress=task.progress)
+
+
+def occupancy_report(start, end, room_type=None):
+    # Reads daily_stats only; see analytics.report
+    return report(hotel_db.connection(), start, end, room_type or None)
+
+
+def find_free_rooms(check_in_date, check_out_date, room_type=None):
+    check_in_date, check_out_date = validate_stay(check_in_date, check_out_date)
+    return free_rooms(hotel_db.connection(), check_in_date, check_out_date, room_type)
@@ -0,0 +1,107 @@
+import argparse
+import csv
+
+# ---------- Room CSV files and room lists for the batch operations ----------
+# A rooms CSV is read and validated completely before anything is written:
+# insert_rooms() adds the whole file in one transaction or nothing at all, so
+# any bad line rejects the file with the line numbers to fix.
+
+ROOM_COLUMNS = ("room_number", "room_type", "price")
+ROOM_TYPES = ("Single", "Double", "Suite")
+MAX_REPORTED_ERRORS = 10
+
+
+def validate_room(row):
+    try:
+        room_number = int(str(row.get("room_number")).strip())
+    except ValueError:
+        raise ValueError(f"invalid room number {row.get('room_number')!r}")
+    if room_number <= 0:
+        raise ValueError(f"invalid room number {room_number}")
+    room_type = (row.get("room_type") or "").strip()
+    if not room_type:
+        raise ValueError("missing room type")
+    # Match the types offered in the Room Type box, whatever the case in the file
+    room_type = next((name for name in ROOM_TYPES if name.lower() == room_type.lower()), room_type)
+    try:
+        price = float(str(row.get("price")).strip())
+    except ValueError:
+        raise ValueError(f"invalid price {row.get('price')!r}")
+    if price < 0:
+        raise ValueError(f"negative price {price}")
+    return room_number, room_type, price
+
+
+def batch_error(message, errors):
+    """ValueError listing the first MAX_REPORTED_ERRORS problems of a rejected batch."""
+    text = "\n".join(errors[:MAX_REPORTED_ERRORS])
+    if len(errors) > MAX_REPORTED_ERRORS:
+        text += f"\n... and {len(errors) - MAX_REPORTED_ERRORS} more"
+    return ValueError(f"{message}:\n{text}")
+
+
+def read_rooms_csv(path):
+    """[(room_number, room_type, price)] from a CSV file; ValueError naming the bad lines."""
+    rooms, errors, seen = [], [], {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        header = [name.strip().lower() for name in reader.fieldnames or []]
+        missing = [name for name in ROOM_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+        reader.fieldnames = header
+        for row in reader:
+            try:
+                room = validate_room(row)
+                if room[0] in seen:
+                    raise ValueError(f"room {room[0]} already on line {seen[room[0]]}")
+            except ValueError as e:
+                errors.append(f"line {reader.line_num}: {e}")
+                continue
+            seen[room[0]] = reader.line_num
+            rooms.append(room)
+    if errors:
+        raise batch_error(f"No rooms imported, {len(errors)} invalid rows", errors)
+    if not rooms:
+        raise ValueError("The CSV file has no rooms.")
+    return rooms
+
+
+def parse_room_numbers(text):
+    """'101-105, 110' -> [101, 102, 103, 104, 105, 110]."""
+    numbers = set()
+    for part in str(text).replace(";", ",").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                first, last = (int(value) for value in part.split("-", 1))
+                if last < first:
+                    raise ValueError
+                numbers.update(range(first, last + 1))
+            else:
+                numbers.add(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid room list entry {part!r}, use e.g. 101-105, 110")
+    if not numbers:
+        raise ValueError("Please enter the room numbers, e.g. 101-105, 110")
+    return sorted(numbers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add the rooms in a CSV file to hotel.db in one transaction")
+    parser.add_argument("csv_file")
+    parser.add_argument("--db", default="hotel.db")
+    args = parser.parse_args()
+
+    import hotel_data
+    from db import Database
+    hotel_data.hotel_db = Database(args.db)
+    hotel_data.init_db()
+    rooms = hotel_data.insert_rooms(read_rooms_csv(args.csv_file))
+    print(f"{len(rooms)} rooms added to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
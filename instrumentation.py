@@ -0,0 +1,285 @@
+import functools
+import logging
+import logging.handlers
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from migrations import FULL_SCAN_RE
+
+# ---------- Query and UI timing ----------
+# install(database) makes a Database open ProfiledConnections. They time every
+# statement run through execute()/executemany() and the fetches that follow,
+# count rows, count SQLite VM steps through the progress handler and keep the
+# EXPLAIN QUERY PLAN of each distinct statement. The trace callback keeps the
+# most recent statements as SQLite actually ran them (commits and trigger
+# bodies included). span()/timed() time UI callbacks and background tasks.
+# Slow statements, slow spans and unexpected errors go to slow_ops.log, which
+# rotates at LOG_BYTES; the Diagnostics window shows the rest.
+
+SLOW_QUERY_MS = 50
+SLOW_SPAN_MS = 100
+PROGRESS_STEPS = 1000  # VM instructions per progress-handler call, the unit of "steps"
+MAX_ENTRIES = 500      # distinct statements / span names kept
+RECENT = 200
+LOG_FILE = "slow_ops.log"
+LOG_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+PLANNED_RE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+
+log = logging.getLogger("perf")
+log.addHandler(logging.NullHandler())
+log.propagate = False
+
+
+def setup_log(path=LOG_FILE, max_bytes=LOG_BYTES, backups=LOG_BACKUPS):
+    """Send slow operations and errors to a rotating log file."""
+    if not any(isinstance(h, logging.handlers.RotatingFileHandler) for h in log.handlers):
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(threadName)s %(message)s"))
+        log.addHandler(handler)
+        log.setLevel(logging.INFO)
+
+
+def log_error(error, context=""):
+    log.error("%s%s: %s", f"{context} " if context else "", type(error).__name__, error, exc_info=error)
+
+
+class Stats:
+    """calls / total / max per name, plus rows and VM steps for statements."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries = {}
+
+    def add(self, name, ms, rows=0, steps=0, calls=1):
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                if len(self.entries) >= MAX_ENTRIES:
+                    name = "(other)"
+                entry = self.entries.setdefault(name, {"name": name, "calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                       "rows": 0, "steps": 0})
+            entry["calls"] += calls
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["rows"] += rows
+            entry["steps"] += steps
+
+    def snapshot(self):
+        with self._lock:
+            rows = [dict(entry) for entry in self.entries.values()]
+        for row in rows:
+            row["avg_ms"] = row["total_ms"] / row["calls"] if row["calls"] else 0.0
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.entries.clear()
+
+
+class Plans:
+    """EXPLAIN QUERY PLAN lines of the MAX_ENTRIES most recently run statements.
+
+    Bounded like Stats: batch code such as select_in produces a new statement
+    for every IN list length.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._plans = OrderedDict()
+
+    def get(self, sql, default=None):
+        with self._lock:
+            plan = self._plans.get(sql)
+            if plan is None:
+                return default
+            self._plans.move_to_end(sql)
+            return plan
+
+    def put(self, sql, plan):
+        with self._lock:
+            self._plans[sql] = plan
+            self._plans.move_to_end(sql)
+            while len(self._plans) > MAX_ENTRIES:
+                self._plans.popitem(last=False)
+
+
+class Profiler:
+    def __init__(self):
+        self.queries = Stats()
+        self.spans = Stats()
+        self.plans = Plans()
+        self.recent = deque(maxlen=RECENT)  # (time, thread, sql) from the trace callback
+        self._local = threading.local()
+
+    # ----- sqlite callbacks -----
+    def trace(self, sql):
+        self.recent.append((time.time(), threading.current_thread().name, sql))
+
+    def progress(self):
+        self._local.steps = getattr(self._local, "steps", 0) + 1
+
+    def steps(self):
+        return getattr(self._local, "steps", 0)
+
+    # ----- recording -----
+    def record_query(self, conn, sql, params, ms, rows, steps, many=False):
+        self.queries.add(sql, ms, rows, steps)
+        plan = self.plans.get(sql)
+        if plan is None and not many and PLANNED_RE.match(sql):
+            plan = self.explain(conn, sql, params)
+            self.plans.put(sql, plan)
+        if ms >= SLOW_QUERY_MS:
+            log.warning("slow query %.1f ms rows=%d steps=%d: %s | plan: %s",
+                        ms, rows, steps, " ".join(sql.split()), "; ".join(plan or []))
+
+    def record_fetch(self, sql, ms, rows, steps):
+        self.queries.add(sql, ms, rows, steps, calls=0)
+        if ms >= SLOW_QUERY_MS:
+            log.warning("slow fetch %.1f ms rows=%d: %s", ms, rows, " ".join(sql.split()))
+
+    def record_span(self, name, ms):
+        self.spans.add(name, ms)
+        if ms >= SLOW_SPAN_MS:
+            log.warning("slow %s %.1f ms", name, ms)
+
+    @staticmethod
+    def explain(conn, sql, params):
+        try:
+            # The base class method, so the EXPLAIN itself isn't profiled
+            return [row[3] for row in sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params)]
+        except sqlite3.Error as e:
+            return [f"error: {e}"]
+
+    def snapshot(self):
+        queries = self.queries.snapshot()
+        for row in queries:
+            plan = self.plans.get(row["name"], [])
+            row["plan"] = plan
+            row["full_scan"] = any(FULL_SCAN_RE.match(line) for line in plan)
+        return {"queries": queries, "spans": self.spans.snapshot(),
+                "recent": [{"time": t, "thread": thread, "sql": sql} for t, thread, sql in list(self.recent)]}
+
+    def reset(self):
+        self.queries.reset()
+        self.spans.reset()
+        self.recent.clear()
+
+
+profiler = Profiler()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    _sql = None
+    _unrecorded = 0  # rows from fetchone()/iteration, recorded in one go
+
+    def _flush(self):
+        if self._unrecorded:
+            profiler.queries.add(self._sql, 0.0, rows=self._unrecorded, calls=0)
+            self._unrecorded = 0
+
+    def execute(self, sql, params=()):
+        self._flush()
+        start, steps = time.perf_counter(), profiler.steps()
+        super().execute(sql, params)
+        self._sql = sql
+        profiler.record_query(self.connection, sql, params, (time.perf_counter() - start) * 1000,
+                              max(self.rowcount, 0), profiler.steps() - steps)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._flush()
+        start, steps = time.perf_counter(), profiler.steps()
+        super().executemany(sql, seq_of_params)
+        self._sql = sql
+        profiler.record_query(self.connection, sql, None, (time.perf_counter() - start) * 1000,
+                              max(self.rowcount, 0), profiler.steps() - steps, many=True)
+        return self
+
+    def _fetched(self, start, steps, rows):
+        if self._sql is not None:
+            profiler.record_fetch(self._sql, (time.perf_counter() - start) * 1000, rows, profiler.steps() - steps)
+
+    def fetchone(self):
+        # execute() already stepped to the first row, so only count it
+        row = super().fetchone()
+        if row is not None and self._sql is not None:
+            self._unrecorded += 1
+        return row
+
+    def fetchmany(self, size=None):
+        start, steps = time.perf_counter(), profiler.steps()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, steps, len(rows))
+        return rows
+
+    def fetchall(self):
+        start, steps = time.perf_counter(), profiler.steps()
+        rows = super().fetchall()
+        self._fetched(start, steps, len(rows))
+        return rows
+
+    def __next__(self):
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._flush()
+            raise
+        if self._sql is not None:
+            self._unrecorded += 1
+        return row
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        self._flush()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(profiler.trace)
+        self.set_progress_handler(profiler.progress, PROGRESS_STEPS)
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def install(*databases):
+    """Profile every connection these Database objects open from now on."""
+    for database in databases:
+        database.factory = ProfiledConnection
+        database.close()  # connections opened earlier are reopened profiled
+
+
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record_span(name, (time.perf_counter() - start) * 1000)
+
+
+def timed(name):
+    """Decorator recording every call of a function as a span."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
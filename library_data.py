@@ -0,0 +1,111 @@
+import os
+import sqlite3
+
+from cache import QueryCache
+from db import PAGE_SIZE, Database, keyset_sql
+from exporter import export_query
+from catalog import bulk_changes
+from library_import import import_csv, normalise_isbn
+from library_search import bulk_indexing, search_books, search_key, search_query
+from migrations import LIBRARY_MIGRATIONS, migrate
+
+# Library data layer. Everything here is GUI-independent: LibraryApp, the
+# HTTP API server (api_server.py) and scripts all call these functions.
+
+# ---------- Database Setup ----------
+# Every CRUD function goes through one long-lived connection per thread
+books_db = Database("books.db")
+# Pages and search results are served from memory until a write changes the table
+books_cache = QueryCache()
+
+def connect(db="books.db", seed=True):
+    conn = sqlite3.connect(db)
+    cur = conn.cursor()
+    migrate(conn, LIBRARY_MIGRATIONS)
+
+    cur.execute("SELECT COUNT(*) FROM books")
+    if seed and cur.fetchone()[0] == 0 and os.path.exists("sample_books_dataset.csv"):
+        import_csv(conn, "sample_books_dataset.csv")
+    conn.close()
+    books_cache.invalidate()
+
+# ---------- CRUD Functions ----------
+def cached(key, sql, params=()):
+    conn = books_db.connection()
+    books_cache.check(conn)
+    return books_cache.get_or_load(key, lambda: conn.execute(sql, params).fetchall())
+
+def view():
+    return cached(("view",), "SELECT * FROM books")
+
+def view_page(after=None, before=None, limit=PAGE_SIZE):
+    return cached(("page", after, before, limit), *keyset_sql("books", "id", after, before, limit))
+
+# Write functions return the affected row (or deleted id) so views can update in place
+def get_book(cur, book_id):
+    cur.execute("SELECT * FROM books WHERE id=?", (book_id,))
+    return cur.fetchone()
+
+# ISBNs are stored as the CSV import stores them (no dashes or spaces), which
+# is what the ISBN prefix search looks for; a book may have no ISBN
+def stored_isbn(isbn):
+    return normalise_isbn(isbn) if str(isbn or "").strip() else ""
+
+# The cache is invalidated after the commit, so no reader can re-cache the old rows
+def insert(title, author, year, isbn):
+    isbn = stored_isbn(isbn)
+    with books_db.transaction() as conn:
+        cur = conn.cursor()
+        cur.execute("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", (title, author, year, isbn))
+        book = get_book(cur, cur.lastrowid)
+    books_cache.invalidate()
+    return book
+
+def delete(book_id):
+    with books_db.transaction() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM books WHERE id=?", (book_id,))
+        deleted = book_id if cur.rowcount else None
+    books_cache.invalidate()
+    return deleted
+
+def update(book_id, title, author, year, isbn):
+    isbn = stored_isbn(isbn)
+    with books_db.transaction() as conn:
+        cur = conn.cursor()
+        cur.execute("UPDATE books SET title=?, author=?, year=?, isbn=? WHERE id=?",
+                    (title, author, year, isbn, book_id))
+        book = get_book(cur, book_id)
+    books_cache.invalidate()
+    return book
+
+def search(title="", author="", year="", isbn="", limit=None):
+    conn = books_db.connection()
+    books_cache.check(conn)
+    return books_cache.get_or_load(("search", limit) + search_key(conn, title, author, year, isbn),
+                                   search_books, conn, title, author, year, isbn, limit)
+
+def insert_many(rows):
+    """Insert validated (title, author, year, isbn) tuples in one transaction; returns the count."""
+    with books_db.transaction() as conn, bulk_indexing(conn), bulk_changes(conn):
+        conn.executemany("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", rows)
+    books_cache.invalidate()
+    return len(rows)
+
+def cache_stats():
+    return books_cache.stats()
+
+# ---------- Background Jobs ----------
+# Run on TaskRunner worker threads; task.progress() raises TaskCancelled after Cancel
+def import_job(file_path, task):
+    try:
+        return import_csv(books_db.connection(), file_path, on_progress=task.progress)
+    finally:
+        books_cache.invalidate()
+
+def export_job(file_path, filters, task):
+    # Streams the current search (the whole table when filters is None or empty) straight to disk
+    conn = books_db.connection()
+    export_query(conn, *search_query(conn, *(filters or ())), file_path, on_progress=task.progress,
+                 columns=["ID", "Title", "Author", "Year", "ISBN"])
+    return file_path
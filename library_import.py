@@ -0,0 +1,142 @@
+import argparse
+import csv
+import datetime
+import itertools
+import sqlite3
+
+from catalog import bulk_changes
+from library_search import bulk_indexing
+
+# ---------- Streaming CSV import into books.db ----------
+# Rows are read lazily with the csv module, validated one at a time and written
+# in executemany batches inside a single transaction, so memory use depends on
+# the batch size and not on the size of the file.
+
+REQUIRED_COLUMNS = ("title", "author", "year", "isbn")
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_PRAGMAS = {
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": -64000,  # negative = KiB, so roughly 64 MB of page cache
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.rejected = 0
+        self.errors = []  # (line number, message), capped at MAX_REPORTED_ERRORS
+
+    def reject(self, line_no, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, message))
+
+    def summary(self):
+        text = f"{self.inserted} books imported, {self.rejected} rows rejected."
+        for line_no, message in self.errors[:10]:
+            text += f"\nline {line_no}: {message}"
+        if self.rejected > 10:
+            text += f"\n... and {self.rejected - 10} more"
+        return text
+
+
+def normalise_isbn(value):
+    isbn = str(value).strip().upper().replace("-", "").replace(" ", "")
+    if isbn.endswith(".0"):  # numeric ISBNs round-tripped through a spreadsheet
+        isbn = isbn[:-2]
+    if len(isbn) == 13 and isbn.isdigit():
+        return isbn
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        return isbn
+    raise ValueError(f"invalid ISBN {value!r}")
+
+
+def parse_year(value):
+    try:
+        year = int(float(str(value).strip()))
+    except ValueError:
+        raise ValueError(f"invalid year {value!r}")
+    if year > datetime.date.today().year + 1:
+        raise ValueError(f"year {year} is in the future")
+    return year
+
+
+def validate_row(row):
+    title = (row.get("title") or "").strip()
+    author = (row.get("author") or "").strip()
+    if not title:
+        raise ValueError("missing title")
+    if not author:
+        raise ValueError("missing author")
+    return title, author, parse_year(row.get("year")), normalise_isbn(row.get("isbn"))
+
+
+def iter_csv_rows(path):
+    """Yield (line number, row dict) pairs from a CSV file without loading it whole."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        header = [name.strip().lower() for name in reader.fieldnames or []]
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+        reader.fieldnames = header
+        for row in reader:
+            yield reader.line_num, row
+
+
+def iter_valid_rows(rows, report):
+    for line_no, row in rows:
+        try:
+            yield validate_row(row)
+        except ValueError as e:
+            report.reject(line_no, str(e))
+
+
+def import_csv(conn, path, batch_size=BATCH_SIZE, on_progress=None):
+    """Import a CSV into the books table in one transaction and return an ImportReport."""
+    report = ImportReport()
+    previous = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in IMPORT_PRAGMAS}
+    for name, value in IMPORT_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    try:
+        rows = iter_valid_rows(iter_csv_rows(path), report)
+        with bulk_indexing(conn), bulk_changes(conn):
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", batch)
+                report.inserted += len(batch)
+                if on_progress:
+                    on_progress(report.inserted)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        for name, value in previous.items():
+            conn.execute(f"PRAGMA {name}={value}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import books from a CSV file into books.db")
+    parser.add_argument("csv_file")
+    parser.add_argument("--db", default="books.db")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    from library_data import connect
+    connect(args.db, seed=False)
+    with sqlite3.connect(args.db) as conn:
+        report = import_csv(conn, args.csv_file, args.batch_size,
+                            on_progress=lambda n: print(f"\r{n} rows", end="", flush=True))
+    print()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import re
+import sqlite3
+import unicodedata
+from contextlib import contextmanager
+
+# ---------- Full-text search index for the books table ----------
+# Title and author go into an external-content FTS5 table kept in sync by
+# triggers; ISBN lookups use a plain B-tree index and a prefix range scan.
+# When FTS5 is not compiled into sqlite the LIKE path is used instead.
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author,
+        content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO books_fts(rowid, title, author) VALUES (new.id, new.title, new.author);
+    END""",
+]
+
+
+def fts5_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def has_search_index(conn):
+    cur = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='books_fts'")
+    return cur.fetchone() is not None
+
+
+def ensure_search_index(conn):
+    """Create the search index and sync triggers if missing. Returns True when FTS5 is in use."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_books_isbn ON books(isbn)")
+    if not fts5_available(conn):
+        conn.commit()
+        return False
+    existed = has_search_index(conn)
+    for statement in FTS_SCHEMA:
+        conn.execute(statement)
+    if not existed:
+        # Index whatever rows were in the table before the FTS table existed
+        conn.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+@contextmanager
+def bulk_indexing(conn):
+    """Index rows inserted into books inside the block in one pass on exit.
+
+    The per-row books_fts_ai trigger is ~50x slower than a single
+    INSERT ... SELECT over the new rows, so bulk inserts drop it for the
+    duration. Everything happens in the caller's transaction: a rollback
+    restores the trigger along with the rows.
+    """
+    if not has_search_index(conn):
+        yield
+        return
+    if not conn.in_transaction:
+        conn.execute("BEGIN")  # DDL alone would not open one
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM books").fetchone()[0]
+    conn.execute("DROP TRIGGER IF EXISTS books_fts_ai")
+    yield
+    conn.execute("INSERT INTO books_fts(rowid, title, author) SELECT id, title, author FROM books WHERE id > ?",
+                 (last_id,))
+    conn.execute(FTS_SCHEMA[1])  # recreate books_fts_ai
+
+
+def tokens(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def match_expression(title="", author=""):
+    """Build an FTS5 MATCH string with prefix matching on every token, or None."""
+    parts = []
+    for column, text in (("title", title), ("author", author)):
+        words = tokens(text) if text else []
+        if words:
+            terms = " AND ".join('"%s"*' % word.replace('"', '""') for word in words)
+            parts.append(f"{column} : ({terms})")
+    return " AND ".join(parts) or None
+
+
+def normalise_isbn_query(isbn):
+    return str(isbn).strip().upper().replace("-", "").replace(" ", "")
+
+
+def fold(text):
+    # Lowercase and strip diacritics like the unicode61 tokenizer (remove_diacritics 2)
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def row_matches(row, title="", author="", isbn=""):
+    """Check an (id, title, author, year, isbn) row against the FTS title/author/ISBN filters in memory."""
+    for text, query in ((row[1], title), (row[2], author)):
+        words = TOKEN_RE.findall(fold(text))
+        for term in TOKEN_RE.findall(fold(query)):
+            if not any(word.startswith(term) for word in words):
+                return False
+    prefix = normalise_isbn_query(isbn) if isbn else ""
+    return str(row[4] or "").startswith(prefix)
+
+
+def isbn_prefix_range(prefix):
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def like_query(title="", author="", year="", isbn="", limit=None):
+    query = "SELECT * FROM books WHERE 1=1"
+    values = []
+    if title: query += " AND title LIKE ?"; values.append(f"%{title}%")
+    if author: query += " AND author LIKE ?"; values.append(f"%{author}%")
+    if year: query += " AND year=?"; values.append(year)
+    if isbn: query += " AND isbn LIKE ?"; values.append(f"%{normalise_isbn_query(isbn)}%")
+    if limit: query += " LIMIT ?"; values.append(limit)
+    return query, values
+
+
+def like_search(conn, title="", author="", year="", isbn="", limit=None):
+    return conn.execute(*like_query(title, author, year, isbn, limit)).fetchall()
+
+
+def search_query(conn, title="", author="", year="", isbn="", limit=None):
+    """SQL and parameters for a search: ranked FTS5 when possible, else the LIKE form."""
+    match = match_expression(title, author)
+    if (title or author) and (match is None or not has_search_index(conn)):
+        return like_query(title, author, year, isbn, limit)
+
+    if match:
+        query = ("SELECT b.id, b.title, b.author, b.year, b.isbn FROM books_fts f "
+                 "JOIN books b ON b.id = f.rowid WHERE books_fts MATCH ?")
+        values = [match]
+    else:
+        query = "SELECT b.id, b.title, b.author, b.year, b.isbn FROM books b WHERE 1=1"
+        values = []
+    if year: query += " AND b.year=?"; values.append(year)
+    prefix = normalise_isbn_query(isbn) if isbn else ""
+    if prefix:
+        low, high = isbn_prefix_range(prefix)
+        query += " AND b.isbn >= ? AND b.isbn < ?"; values.extend([low, high])
+    query += " ORDER BY f.rank" if match else " ORDER BY b.id"
+    if limit: query += " LIMIT ?"; values.append(limit)
+    return query, values
+
+
+def search_key(conn, title="", author="", year="", isbn=""):
+    """Cache key for a search: two searches with the same key return the same rows."""
+    match = match_expression(title, author)
+    if (title or author) and (match is None or not has_search_index(conn)):
+        return ("like", title, author, year, isbn)
+    # FTS5 matching is case- and spacing-insensitive, so key on the MATCH string
+    return ("fts", match, str(year), normalise_isbn_query(isbn) if isbn else "")
+
+
+def search_books(conn, title="", author="", year="", isbn="", limit=None):
+    """Ranked, prefix-matching search; falls back to LIKE scans without FTS5."""
+    try:
+        return conn.execute(*search_query(conn, title, author, year, isbn, limit)).fetchall()
+    except sqlite3.OperationalError:
+        # FTS5 table present in the file but the module is missing at runtime
+        return like_search(conn, title, author, year, isbn, limit)
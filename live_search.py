@@ -0,0 +1,94 @@
+from library_search import row_matches
+
+# ---------- Search as you type ----------
+# Keystrokes in the search fields are debounced; only the last query of a burst
+# runs. A query that merely extends the previous one (more letters in title,
+# author or ISBN, same year) is answered by filtering the previous results in
+# memory when those were complete, so typing a word out costs one database
+# query, not one per letter. Only the top TOP_N matches are fetched and shown.
+
+DEBOUNCE_MS = 150
+TOP_N = 100
+
+
+def extends(old, new):
+    """True when every match of query `new` is also a match of query `old`."""
+    (old_title, old_author, old_year, old_isbn), (title, author, year, isbn) = old, new
+    return (title.startswith(old_title) and author.startswith(old_author)
+            and isbn.startswith(old_isbn) and year == old_year)
+
+
+class LiveSearch:
+    """Runs search(title, author, year, isbn, limit=...) as the user types in `entries`."""
+
+    def __init__(self, root, entries, runner, search, pager, on_clear, delay_ms=DEBOUNCE_MS, limit=TOP_N, on_show=None):
+        self.root = root
+        self.entries = entries  # {"title": Entry, "author": ..., "year": ..., "isbn": ...}
+        self.runner = runner
+        self.search = search
+        self.pager = pager
+        self.on_clear = on_clear  # called when every field is emptied
+        self.on_show = on_show  # called with the query whose results are now shown
+        self.delay_ms = delay_ms
+        self.limit = limit
+        self.enabled = True
+        self.query = None     # query currently shown
+        self.results = None   # its rows, at most limit + 1
+        self._after_id = None
+        self._task = None
+        self._generation = 0  # bumped per query so late results of superseded ones are dropped
+        for entry in entries.values():
+            entry.bind("<KeyRelease>", self.schedule, add="+")
+
+    def current_query(self):
+        return tuple(self.entries[name].get() for name in ("title", "author", "year", "isbn"))
+
+    def schedule(self, event=None):
+        if not self.enabled:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self.run)
+
+    def run(self):
+        self._after_id = None
+        query = self.current_query()
+        if query == self.query:
+            return  # e.g. arrow keys or Tab
+        self._cancel()
+        if not any(field.strip() for field in query):
+            self.query = self.results = None
+            self.on_clear()
+            return
+        complete = self.results is not None and len(self.results) <= self.limit
+        if complete and extends(self.query, query):
+            title, author, _, isbn = query
+            self._show(query, [row for row in self.results if row_matches(row, title, author, isbn)])
+            return
+        generation = self._generation
+
+        def done(rows):
+            if generation == self._generation:
+                self._show(query, rows)
+        # One extra row tells whether the shown results are the complete set
+        self._task = self.runner.submit(self.search, *query, limit=self.limit + 1, on_done=done)
+
+    def _cancel(self):
+        self._generation += 1
+        if self._task is not None:
+            self._task.cancel()  # still queued behind other db work: never runs
+            self._task = None
+
+    def _show(self, query, rows):
+        self.query, self.results = query, rows
+        self.pager.show(rows[:self.limit])
+        if self.on_show is not None:
+            self.on_show(query)
+
+    def reset(self):
+        """Forget the shown query, e.g. after Show All or a click on Search."""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._cancel()
+        self.query = self.results = None
@@ -1,84 +1,45 @@
+from startup import timer
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sqlite3
-import pandas as pd
-import os
 from tkinter import filedialog
-
-# ---------- Database Setup ----------
-def connect():
-    conn = sqlite3.connect("books.db")
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS books (
-            id INTEGER PRIMARY KEY,
-            title TEXT,
-            author TEXT,
-            year INTEGER,
-            isbn TEXT)
-    """)
-    conn.commit()
-
-    cur.execute("SELECT COUNT(*) FROM books")
-    if cur.fetchone()[0] == 0 and os.path.exists("sample_books_dataset.csv"):
-        df = pd.read_csv("sample_books_dataset.csv")
-        for _, row in df.iterrows():
-            cur.execute("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)",
-                        (row['title'], row['author'], row['year'], row['isbn']))
-        conn.commit()
-    conn.close()
-
-# ---------- CRUD Functions ----------
-def view():
-    with sqlite3.connect("books.db") as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM books")
-        return cur.fetchall()
-
-def insert(title, author, year, isbn):
-    with sqlite3.connect("books.db") as conn:
-        cur = conn.cursor()
-        cur.execute("INSERT INTO books VALUES (NULL, ?, ?, ?, ?)", (title, author, year, isbn))
-
-def delete(book_id):
-    with sqlite3.connect("books.db") as conn:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM books WHERE id=?", (book_id,))
-
-def update(book_id, title, author, year, isbn):
-    with sqlite3.connect("books.db") as conn:
-        cur = conn.cursor()
-        cur.execute("UPDATE books SET title=?, author=?, year=?, isbn=? WHERE id=?",
-                    (title, author, year, isbn, book_id))
-
-def search(title="", author="", year="", isbn=""):
-    with sqlite3.connect("books.db") as conn:
-        cur = conn.cursor()
-        query = "SELECT * FROM books WHERE 1=1"
-        values = []
-        if title: query += " AND title LIKE ?"; values.append(f"%{title}%")
-        if author: query += " AND author LIKE ?"; values.append(f"%{author}%")
-        if year: query += " AND year=?"; values.append(year)
-        if isbn: query += " AND isbn LIKE ?"; values.append(f"%{isbn}%")
-        cur.execute(query, values)
-        return cur.fetchall()
+from paged_view import KeysetSource, ListSource, PagedTreeview
+from tasks import FrameMonitor, TaskRunner
+from exporter import EXPORT_FILETYPES
+from live_search import LiveSearch
+from diagnostics import DiagnosticsWindow
+from instrumentation import install, setup_log
+import library_data
+from library_data import connect, view, view_page, insert, delete, update, search  # re-exported for scripts
+timer.mark("imports")
 
 # ---------- Modern GUI with Dark/Light Mode ----------
 class LibraryApp:
-    def __init__(self, root):
+    def __init__(self, root, backend=None):
+        # backend is library_data (local books.db) or an api_client.LibraryClient with the same functions
+        self.backend = backend or library_data
         self.root = root
         self.root.title("Library Admin Dashboard")
         self.root.geometry("1000x600")
         self.dark_mode = False
         self.selected_book = None
+        self.diagnostics = None
 
         self.colors = {
             "light": {"bg": "#F4F6F8", "fg": "#000", "entry": "#fff", "button": "#3498DB", "sidebar": "#2C3E50", "sidebar_fg": "#fff"},
             "dark": {"bg": "#1E1E2F", "fg": "#fff", "entry": "#2A2A3B", "button": "#2980B9", "sidebar": "#11111B", "sidebar_fg": "#fff"},
         }
 
+        self.tasks = TaskRunner(root)
+        self.frames = FrameMonitor(root)  # frame latency of the Tk loop, see frames.stats()
+        self.frames.start()
+
+        # Schema setup and seeding run on the db worker, queued ahead of the first page load
+        self.tasks.submit(self.backend.connect, on_done=lambda _: timer.mark("schema"))
+
         self.set_theme()
         self.build_ui()
+        self.root.after_idle(timer.mark, "window shown")
 
     def set_theme(self):
         self.theme = self.colors["dark" if self.dark_mode else "light"]
@@ -87,9 +48,10 @@ class LibraryApp:
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
         self.set_theme()
+        self.tasks.shutdown()
         self.root.destroy()
         root = tk.Tk()
-        app = LibraryApp(root)
+        app = LibraryApp(root, self.backend)
         root.mainloop()
 
     def build_ui(self):
@@ -98,10 +60,11 @@ class LibraryApp:
         tk.Label(sidebar, text="Library", fg=self.theme["sidebar_fg"], bg=self.theme["sidebar"],
                  font=("Arial", 20, "bold")).pack(pady=20)
 
-        for label in ["Dashboard", "Books", "Members", "Settings"]:
+        for label in ["Dashboard", "Books", "Members", "Settings", "Diagnostics"]:
             tk.Button(sidebar, text=label, bg=self.theme["sidebar"], fg=self.theme["sidebar_fg"],
                       activebackground="#34495E", relief="flat", font=("Arial", 12),
-                      anchor="w", padx=20).pack(fill="x", pady=2)
+                      anchor="w", padx=20, command=self.show_diagnostics if label == "Diagnostics" else None
+                      ).pack(fill="x", pady=2)
 
         topbar = tk.Frame(self.root, height=50, bg=self.theme["entry"])
         topbar.pack(side="top", fill="x")
@@ -129,10 +92,15 @@ class LibraryApp:
             ("Delete", self.delete_book),
             ("Search", self.search_books),
             ("Show All", self.load_books),
+            ("Import", self.import_books),
             ("Export", self.export_books)
         ]
         for txt, cmd in buttons:
             tk.Button(btn_frame, text=txt, command=cmd, width=12, bg=self.theme["button"], fg="white", font=("Arial", 10), relief="flat").pack(side="left", padx=5)
+        self.live_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(btn_frame, text="Live Search", variable=self.live_var, command=self.toggle_live_search,
+                       bg=self.theme["bg"], fg=self.theme["fg"], selectcolor=self.theme["entry"],
+                       activebackground=self.theme["bg"]).pack(side="left", padx=5)
 
         table_frame = tk.Frame(content, bg=self.theme["bg"])
         table_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -141,7 +109,17 @@ class LibraryApp:
         for col in self.tree["columns"]:
             self.tree.heading(col, text=col.title())
             self.tree.column(col, width=150)
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
         self.tree.pack(fill="both", expand=True)
+        self.pager = PagedTreeview(self.tree, KeysetSource(self.backend.view_page), scrollbar, runner=self.tasks)
+        self.pager.on_load = lambda rows: timer.finish()
+        # Filters of the search the table shows, set by Search and by live search
+        # (top matches while typing in the form fields); None after Show All.
+        # Export writes every book matching them.
+        self.shown_filters = None
+        self.live_search = LiveSearch(self.root, self.entries, self.tasks, self.backend.search, self.pager,
+                                      on_clear=self.load_books, on_show=self.set_shown_filters)
         self.tree.bind("<<TreeviewSelect>>", self.select_book)
 
         self.load_books()
@@ -158,44 +136,96 @@ class LibraryApp:
                 self.entries[key].delete(0, tk.END)
                 self.entries[key].insert(tk.END, values[i+1])
 
+    def show_diagnostics(self):
+        if self.diagnostics is not None and self.diagnostics.exists():
+            self.diagnostics.lift()
+        else:
+            self.diagnostics = DiagnosticsWindow(self.root, self.frames, getattr(self.backend, "cache_stats", None))
+
+    def set_shown_filters(self, filters):
+        self.shown_filters = filters if any(field.strip() for field in filters) else None
+
     def load_books(self):
-        self.tree.delete(*self.tree.get_children())
-        for book in view():
-            self.tree.insert("", tk.END, values=book)
+        self.live_search.reset()
+        self.shown_filters = None
+        self.pager.set_source(KeysetSource(self.backend.view_page))
+
+    def toggle_live_search(self):
+        self.live_search.enabled = self.live_var.get()
+        self.live_search.reset()
 
     def add_book(self):
-        insert(*self.get_inputs())
-        self.load_books()
-        messagebox.showinfo("Success", "Book added.")
+        def done(book):
+            self.live_search.reset()  # cached live results no longer reflect the table
+            self.pager.upsert(book)
+            self.tasks.notify(messagebox.showinfo, "Success", "Book added.")
+        self.tasks.submit(self.backend.insert, *self.get_inputs(), on_done=done,
+                          on_error=lambda e: self.tasks.notify(messagebox.showerror, "Error", str(e)), span="ui add_book")
 
     def update_book(self):
         if self.selected_book:
-            update(self.selected_book, *self.get_inputs())
-            self.load_books()
-            messagebox.showinfo("Updated", "Book updated.")
+            def done(book):
+                self.live_search.reset()
+                if book:
+                    self.pager.upsert(book)
+                self.tasks.notify(messagebox.showinfo, "Updated", "Book updated.")
+            self.tasks.submit(self.backend.update, self.selected_book, *self.get_inputs(), on_done=done,
+                              on_error=lambda e: self.tasks.notify(messagebox.showerror, "Error", str(e)), span="ui update_book")
 
     def delete_book(self):
         if self.selected_book:
-            delete(self.selected_book)
-            self.load_books()
-            messagebox.showinfo("Deleted", "Book deleted.")
+            book_id, self.selected_book = self.selected_book, None
+            def done(deleted):
+                self.live_search.reset()
+                self.pager.remove(deleted or book_id)
+                self.tasks.notify(messagebox.showinfo, "Deleted", "Book deleted.")
+            self.tasks.submit(self.backend.delete, book_id, on_done=done, span="ui delete_book")
 
     def search_books(self):
-        self.tree.delete(*self.tree.get_children())
-        for book in search(*self.get_inputs()):
-            self.tree.insert("", tk.END, values=book)
+        self.live_search.reset()
+        filters = self.get_inputs()
+
+        def done(books):
+            self.set_shown_filters(filters)
+            self.pager.set_source(ListSource(books))
+        self.tasks.submit(self.backend.search, *filters, on_done=done, span="ui search_books")
+
+    def import_books(self):
+        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        if file_path:
+            def done(report):
+                self.load_books()
+                self.tasks.notify(messagebox.showinfo, "Imported", report.summary())
+            self.tasks.submit_with_dialog("Import", "Importing books...", self.backend.import_job, file_path, on_done=done,
+                                          on_error=lambda e: self.tasks.notify(messagebox.showerror, "Import failed", str(e)))
 
     def export_books(self):
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=EXPORT_FILETYPES)
         if file_path:
-            books = view()
-            df = pd.DataFrame(books, columns=["ID", "Title", "Author", "Year", "ISBN"])
-            df.to_csv(file_path, index=False)
-            messagebox.showinfo("Exported", f"Books exported to {file_path}")
+            self.tasks.submit_with_dialog("Export", "Exporting books...", self.backend.export_job, file_path, self.shown_filters,
+                                          on_done=lambda path: self.tasks.notify(messagebox.showinfo, "Exported", f"Books exported to {path}"),
+                                          on_error=lambda e: self.tasks.notify(messagebox.showerror, "Export failed", str(e)))
 
 # ---------- Run App ----------
 if __name__ == "__main__":
-    connect()
+    parser = argparse.ArgumentParser(description="Library Admin Dashboard")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--server", help="use a shared api_server.py backend, e.g. http://127.0.0.1:8080")
+    source.add_argument("--kiosk", action="store_true", help="browse a read-only snapshot of books.db (see catalog.py)")
+    parser.add_argument("--startup-report", action="store_true", help="print startup timings")
+    args = parser.parse_args()
+    timer.enable(args.startup_report)
+
+    backend = None
+    if args.server:
+        from api_client import LibraryClient
+        backend = LibraryClient(args.server)
+    elif args.kiosk:
+        from catalog import Catalog
+        backend = Catalog()
+    else:
+        install(library_data.books_db)
+    setup_log()
     root = tk.Tk()
-    app = LibraryApp(root)
+    app = LibraryApp(root, backend)
     root.mainloop()
@@ -0,0 +1,175 @@
+import argparse
+import re
+import sqlite3
+
+from analytics import DAILY_STATS_SCHEMA, rebuild_daily_stats
+from availability import AVAILABILITY_INDEXES
+from catalog import CHANGES_SCHEMA
+from library_search import ensure_search_index
+
+# ---------- Versioned schema migrations ----------
+# Each database records the last applied migration in PRAGMA user_version.
+# Steps are SQL strings or callables taking the connection; they are written
+# to be idempotent (IF NOT EXISTS) so files created by older versions of the
+# apps, which already have the tables but user_version 0, upgrade cleanly.
+
+LIBRARY_MIGRATIONS = [
+    (1, "create books table", [
+        """CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            author TEXT,
+            year INTEGER,
+            isbn TEXT)""",
+    ]),
+    (2, "full-text search index", [ensure_search_index]),
+    # Title/author filters are answered by books_fts; year filters need their own index
+    (3, "year index", [
+        "CREATE INDEX IF NOT EXISTS idx_books_year ON books(year)",
+    ]),
+    # Bumped by every write to books; kiosks rebuild their catalog snapshot when it moves
+    (4, "catalog change counter", CHANGES_SCHEMA),
+    # ISBNs typed into the form were stored as entered; search compares them without dashes or spaces
+    (5, "normalised ISBNs", [
+        """UPDATE books SET isbn = upper(replace(replace(trim(isbn), '-', ''), ' ', ''))
+            WHERE isbn != upper(replace(replace(trim(isbn), '-', ''), ' ', ''))""",
+    ]),
+]
+
+HOTEL_MIGRATIONS = [
+    (1, "create rooms, guests and bookings tables", [
+        '''CREATE TABLE IF NOT EXISTS rooms (
+            room_number INTEGER PRIMARY KEY,
+            room_type TEXT,
+            price REAL,
+            is_available INTEGER DEFAULT 1  -- 1 for available, 0 for occupied
+        )''',
+        '''CREATE TABLE IF NOT EXISTS guests (
+            guest_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            phone TEXT,
+            email TEXT
+        )''',
+        '''CREATE TABLE IF NOT EXISTS bookings (
+            booking_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room_number INTEGER,
+            guest_id INTEGER,
+            check_in_date TEXT,
+            check_out_date TEXT,
+            FOREIGN KEY (room_number) REFERENCES rooms(room_number),
+            FOREIGN KEY (guest_id) REFERENCES guests(guest_id)
+        )''',
+    ]),
+    # (room_number, check_in_date, check_out_date, guest_id) covers the overlap
+    # probes, delete_room's booking check and delete_booking's 4-column match
+    (2, "booking stay and room type indexes", AVAILABILITY_INDEXES),
+    (3, "bookings by guest", [
+        "CREATE INDEX IF NOT EXISTS idx_bookings_guest ON bookings(guest_id)",
+    ]),
+    # Nightly room-nights and revenue per room type, filled from the existing bookings
+    (4, "daily occupancy aggregates", DAILY_STATS_SCHEMA + [rebuild_daily_stats]),
+]
+
+# Hot queries checked by explain_report(); parameters only need the right shape
+LIBRARY_HOT_QUERIES = [
+    ("view page", "SELECT * FROM books WHERE id > ? ORDER BY id LIMIT ?", (0, 200)),
+    ("get book", "SELECT * FROM books WHERE id=?", (1,)),
+    ("search title/author",
+     "SELECT b.* FROM books_fts f JOIN books b ON b.id = f.rowid WHERE books_fts MATCH ? ORDER BY f.rank",
+     ('title : ("harry"*)',)),
+    ("search year", "SELECT * FROM books b WHERE b.year=? ORDER BY b.id", (1997,)),
+    ("search isbn", "SELECT * FROM books b WHERE b.isbn >= ? AND b.isbn < ? ORDER BY b.id", ("978", "979")),
+]
+
+HOTEL_HOT_QUERIES = [
+    ("rooms page", "SELECT * FROM rooms WHERE room_number > ? ORDER BY room_number LIMIT ?", (0, 200)),
+    ("bookings page", "SELECT * FROM bookings WHERE booking_id > ? ORDER BY booking_id LIMIT ?", (0, 200)),
+    ("delete_room booking check", "SELECT * FROM bookings WHERE room_number = ?", (101,)),
+    ("delete_booking match",
+     "SELECT booking_id FROM bookings WHERE room_number = ? AND guest_id = ? AND check_in_date = ? AND check_out_date = ?",
+     (101, 1, "2025-01-01", "2025-01-03")),
+    ("overlap probe",
+     "SELECT booking_id FROM bookings WHERE room_number = ? AND check_in_date >= ? AND check_in_date < ?",
+     (101, "2025-01-01", "2025-01-03")),
+    ("rooms by type", "SELECT * FROM rooms WHERE room_type = ? ORDER BY room_number", ("Suite",)),
+    ("bookings by guest", "SELECT * FROM bookings WHERE guest_id = ?", (1,)),
+    ("occupancy report",
+     "SELECT room_type, SUM(room_nights), SUM(revenue) FROM daily_stats WHERE day >= ? AND day < ? GROUP BY room_type",
+     ("2024-01-01", "2025-01-01")),
+]
+
+FULL_SCAN_RE = re.compile(r"^SCAN (?!\(|CONSTANT ROW)(\w+)\b(?! VIRTUAL TABLE INDEX \d+:M)")
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, migrations):
+    """Apply pending migrations in order; returns the (version, name) pairs applied."""
+    applied = []
+    for version, name, steps in migrations:
+        if version <= schema_version(conn):
+            continue
+        for step in steps:
+            if callable(step):
+                step(conn)
+            else:
+                conn.execute(step)
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+        conn.commit()
+        applied.append((version, name))
+    if applied:
+        conn.execute("ANALYZE")
+        conn.commit()
+    return applied
+
+
+def query_plan(conn, sql, params=()):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def explain_report(conn, queries):
+    """(name, plan lines, full scan?) for each hot query."""
+    report = []
+    for name, sql, params in queries:
+        try:
+            plan = query_plan(conn, sql, params)
+        except sqlite3.OperationalError as e:  # e.g. books_fts missing without FTS5
+            plan = [f"error: {e}"]
+        report.append((name, plan, any(FULL_SCAN_RE.match(line) for line in plan)))
+    return report
+
+
+def print_report(title, report):
+    print(title)
+    for name, plan, full_scan in report:
+        print(f"  [{'FULL SCAN' if full_scan else 'ok'}] {name}")
+        for line in plan:
+            print(f"      {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate books.db/hotel.db and check hot query plans")
+    parser.add_argument("--books-db", default="books.db")
+    parser.add_argument("--hotel-db", default="hotel.db")
+    parser.add_argument("--check", action="store_true", help="print EXPLAIN QUERY PLAN for the hot queries")
+    args = parser.parse_args()
+
+    scans = 0
+    for path, migrations, queries in ((args.books_db, LIBRARY_MIGRATIONS, LIBRARY_HOT_QUERIES),
+                                      (args.hotel_db, HOTEL_MIGRATIONS, HOTEL_HOT_QUERIES)):
+        with sqlite3.connect(path) as conn:
+            for version, name in migrate(conn, migrations):
+                print(f"{path}: applied {version} ({name})")
+            print(f"{path}: schema version {schema_version(conn)}")
+            if args.check:
+                report = explain_report(conn, queries)
+                print_report(path, report)
+                scans += sum(full_scan for _, _, full_scan in report)
+    if args.check and scans:
+        raise SystemExit(f"{scans} hot queries do a full table scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import bisect
+import tkinter as tk
+
+from db import PAGE_SIZE
+
+# ---------- Windowed Treeview loading ----------
+# Only a bounded window of rows lives in the Treeview. Pages are fetched with
+# keyset pagination (WHERE key > ? ORDER BY key LIMIT ?) as the user scrolls
+# towards either edge, and pages at the far end of the window are dropped.
+
+MAX_PAGES = 5
+EDGE = 0.1  # fraction of the scroll range that triggers loading the next page
+
+
+class KeysetSource:
+    """Rows fetched from the database by key; fetch_page(after, before, limit) runs the SQL."""
+
+    def __init__(self, fetch_page):
+        self.fetch_page = fetch_page
+
+    def first(self, limit):
+        return self.fetch_page(limit=limit)
+
+    def after(self, row, limit):
+        return self.fetch_page(after=row[0], limit=limit)
+
+    def before(self, row, limit):
+        return list(reversed(self.fetch_page(before=row[0], limit=limit)))
+
+    def add(self, row):
+        pass
+
+    def remove(self, key):
+        pass
+
+
+class ListSource:
+    """Rows already in memory (e.g. ranked search results) paged by position."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self._index()
+
+    def _index(self):
+        self.position = {row[0]: i for i, row in enumerate(self.rows)}
+
+    def first(self, limit):
+        return self.rows[:limit]
+
+    def after(self, row, limit):
+        start = self.position[row[0]] + 1
+        return self.rows[start:start + limit]
+
+    def before(self, row, limit):
+        end = self.position[row[0]]
+        return self.rows[max(0, end - limit):end]
+
+    def add(self, row):
+        if row[0] in self.position:
+            self.rows[self.position[row[0]]] = row
+        else:
+            self.position[row[0]] = len(self.rows)
+            self.rows.append(row)
+
+    def remove(self, key):
+        if key in self.position:
+            del self.rows[self.position[key]]
+            self._index()
+
+
+class PagedTreeview:
+    def __init__(self, tree, source=None, scrollbar=None, page_size=PAGE_SIZE, max_pages=MAX_PAGES, runner=None):
+        self.tree = tree
+        self.source = source
+        self.scrollbar = scrollbar
+        self.runner = runner  # tasks.TaskRunner: pages are fetched off the Tk thread when set
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.rows = {}  # iid -> original row tuple, mirrors the items in the tree
+        self.at_start = self.at_end = True
+        self._loading = False
+        self._generation = 0  # bumped on reload so late pages from an old source are dropped
+        self.on_load = None  # called with the first page after every reload
+        tree.configure(yscrollcommand=self._on_scroll)
+        if scrollbar is not None:
+            scrollbar.configure(command=tree.yview)
+
+    def set_source(self, source):
+        self.source = source
+        self.reload()
+
+    def reload(self):
+        self._generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self.rows.clear()
+        self.at_start = self.at_end = True
+        self._fetch(self.source.first, (self.page_size,), self._apply_first)
+
+    def _fetch(self, fn, args, apply):
+        generation = self._generation
+        self._loading = True
+
+        def done(rows):
+            if generation != self._generation:
+                return
+            try:
+                apply(rows)
+            finally:
+                self._loading = False
+
+        def failed(error):
+            if generation == self._generation:
+                self._loading = False
+            self.runner.report_error(error)
+
+        if self.runner is None:
+            done(fn(*args))
+        else:
+            self.runner.submit(fn, *args, on_done=done, on_error=failed)
+
+    def _apply_first(self, rows):
+        self._append(rows)
+        self.at_end = len(rows) < self.page_size
+        if self.on_load is not None:
+            self.on_load(rows)
+
+    def _append(self, rows):
+        for row in rows:
+            iid = str(row[0])
+            self.rows[iid] = row
+            self.tree.insert("", tk.END, iid=iid, values=row)
+
+    def _prepend(self, rows):
+        for row in reversed(rows):
+            iid = str(row[0])
+            self.rows[iid] = row
+            self.tree.insert("", 0, iid=iid, values=row)
+
+    def _drop(self, iids):
+        self.tree.delete(*iids)
+        for iid in iids:
+            del self.rows[iid]
+
+    def show(self, rows):
+        """Switch to in-memory rows at once, reusing tree items that stay (live search)."""
+        self._generation += 1
+        self._loading = False
+        self.source = ListSource(rows)
+        page = self.source.first(self.page_size)
+        wanted = {str(row[0]) for row in page}
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if stale:
+            self._drop(stale)
+        for index, row in enumerate(page):
+            iid = str(row[0])
+            if iid in self.rows:
+                if self.rows[iid] != row:
+                    self.rows[iid] = row
+                    self.tree.item(iid, values=row)
+                self.tree.move(iid, "", index)
+            else:
+                self.rows[iid] = row
+                self.tree.insert("", index, iid=iid, values=row)
+        self.at_start = True
+        self.at_end = len(page) < self.page_size
+
+    # ----- Incremental changes: applied by key, no reload -----
+    def upsert(self, row):
+        """Show an inserted or updated row if it belongs inside the loaded window."""
+        iid = str(row[0])
+        if self.source is not None:
+            self.source.add(row)
+        if iid in self.rows:
+            self.rows[iid] = row
+            self.tree.item(iid, values=row)
+            return
+        if isinstance(self.source, ListSource):
+            # Search results keep their ranking order; new rows go last
+            if not self.at_end:
+                return
+            index = tk.END
+        else:
+            keys = [self.rows[child][0] for child in self.tree.get_children()]
+            if keys and row[0] < keys[0] and not self.at_start:
+                return
+            if keys and row[0] > keys[-1] and not self.at_end:
+                return
+            index = bisect.bisect_left(keys, row[0])
+        self.rows[iid] = row
+        self.tree.insert("", index, iid=iid, values=row)
+
+    def remove(self, key):
+        iid = str(key)
+        if self.source is not None:
+            self.source.remove(key)
+        if iid in self.rows:
+            self._drop([iid])
+
+    def _top_index(self):
+        first, _ = self.tree.yview()
+        return int(round(float(first) * len(self.rows)))
+
+    def load_next(self):
+        children = self.tree.get_children()
+        if self.at_end or not children:
+            return
+        self._fetch(self.source.after, (self.rows[children[-1]], self.page_size), self._apply_next)
+
+    def _apply_next(self, rows):
+        self.at_end = len(rows) < self.page_size
+        top = self._top_index()
+        self._append(rows)
+        overflow = len(self.rows) - self.max_rows
+        if overflow > 0:
+            self._drop(self.tree.get_children()[:overflow])
+            self.at_start = False
+            self.tree.yview_moveto(max(0, top - overflow) / len(self.rows))
+
+    def load_previous(self):
+        children = self.tree.get_children()
+        if self.at_start or not children:
+            return
+        self._fetch(self.source.before, (self.rows[children[0]], self.page_size), self._apply_previous)
+
+    def _apply_previous(self, rows):
+        self.at_start = len(rows) < self.page_size
+        top = self._top_index()
+        self._prepend(rows)
+        overflow = len(self.rows) - self.max_rows
+        if overflow > 0:
+            self._drop(self.tree.get_children()[-overflow:])
+            self.at_end = False
+        self.tree.yview_moveto((top + len(rows)) / len(self.rows))
+
+    def _on_scroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if self._loading or self.source is None:
+            return
+        if float(last) >= 1 - EDGE:
+            self.load_next()
+        elif float(first) <= EDGE:
+            self.load_previous()
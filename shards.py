@@ -0,0 +1,395 @@
+import argparse
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import hotel_data
+from analytics import merge_reports, rebuild_daily_stats
+from availability import validate_stay
+from cache import QueryCache
+from db import PAGE_SIZE, Database
+from exporter import export_batches, iter_batches
+from hotel_import import read_rooms_csv
+from migrations import HOTEL_MIGRATIONS, migrate
+
+# ---------- Sharded hotel backend for several properties ----------
+# Each property has its own database file and a range of room numbers,
+# listed in a properties file:
+#
+#   {"properties": [
+#       {"name": "Harbour", "db": "harbour.db", "rooms": [100, 1999]},
+#       {"name": "Hilltop", "db": "hilltop.db", "rooms": [2000, 3999]}]}
+#
+# A room belongs to the property whose range holds its number. Guests and
+# bookings are numbered from a block of ID_BLOCK ids per property, so every
+# id also names its property. Add new properties at the end of the file:
+# a property's place in the list is its block.
+#
+# ShardedHotel offers the hotel_data functions, so the hotel app can run on
+# it unchanged (python Hotelmanagementystem.py --properties properties.json).
+# The calls run hotel_data itself in a pool of worker processes, one
+# property database at a time, so properties are written and read in
+# parallel instead of queueing behind one hotel.db. Lookups and writes go to
+# the property that owns the key; pages, free rooms, exports and reports
+# ask every property at once and merge the answers.
+#
+# Batch operations stay one transaction, so a batch may only cover one
+# property. A guest can book rooms at any property: the guest row is copied,
+# id and all, to that property's database first (guests are never changed
+# afterwards), and new guests are numbered within their property's block.
+#
+#   python shards.py properties.json --split hotel.db       # move an existing hotel.db into the properties
+#   python shards.py properties.json --free 2025-06-01 2025-06-05 --room-type Suite
+
+ID_BLOCK = 10 ** 9
+ONE_PROPERTY = "A batch can only cover one property"
+
+
+class Property:
+    def __init__(self, index, name, path, first_room, last_room):
+        self.index = index
+        self.name = name
+        self.path = path
+        self.first_room = first_room
+        self.last_room = last_room
+
+    def owns(self, room_number):
+        return self.first_room <= room_number <= self.last_room
+
+    def first_id(self):
+        return self.index * ID_BLOCK + 1
+
+    def last_id(self):
+        return (self.index + 1) * ID_BLOCK
+
+
+def load_properties(path):
+    """[Property] from a properties file; database paths are relative to the file."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f).get("properties") or []
+    if not entries:
+        raise ValueError(f"{path} lists no properties.")
+    folder = os.path.dirname(os.path.abspath(path))
+    properties = []
+    for index, entry in enumerate(entries):
+        try:
+            first_room, last_room = (int(n) for n in entry["rooms"])
+            prop = Property(index, str(entry["name"]), os.path.join(folder, entry["db"]), first_room, last_room)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{path}: property {index + 1} needs a name, a db and rooms [first, last]")
+        if last_room < first_room:
+            raise ValueError(f"{path}: {prop.name} has rooms {first_room}-{last_room}")
+        for other in properties:
+            if other.path == prop.path:
+                raise ValueError(f"{path}: {other.name} and {prop.name} share {entry['db']}")
+            if first_room <= other.last_room and other.first_room <= last_room:
+                raise ValueError(f"{path}: the rooms of {other.name} and {prop.name} overlap")
+        properties.append(prop)
+    return properties
+
+
+def reserve_ids(conn, first_id):
+    """Start the guest and booking ids of this database at first_id."""
+    for table in ("guests", "bookings"):
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        if row is None:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, first_id - 1))
+        elif row[0] < first_id - 1:
+            conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (first_id - 1, table))
+    conn.commit()
+
+
+# ----- Worker processes -----
+# Each worker keeps a Database and a QueryCache per property and points
+# hotel_data at the right pair before every call; a worker runs one call at
+# a time. Several workers on one database coordinate through SQLite's locks
+# and PRAGMA data_version, as separate copies of the app do.
+_databases = {}
+
+
+def use(path):
+    if path not in _databases:
+        _databases[path] = (Database(path), QueryCache())
+    hotel_data.hotel_db, hotel_data.hotel_cache = _databases[path]
+
+
+def run(path, name, *args):
+    use(path)
+    return getattr(hotel_data, name)(*args)
+
+
+def init_shard(path, first_id):
+    use(path)
+    hotel_data.init_db()
+    reserve_ids(hotel_data.hotel_db.connection(), first_id)
+
+
+def add_guest(conn, first_id, last_id, name, phone, email):
+    # Copied guests keep the ids of their own property, and AUTOINCREMENT
+    # numbers a new row past the largest id in the table, so after a copy
+    # from a later property it would leave this property's block. New guests
+    # take the next id of the block instead.
+    guest_id = conn.execute("SELECT coalesce(max(guest_id), ?) + 1 FROM guests WHERE guest_id BETWEEN ? AND ?",
+                            (first_id - 1, first_id, last_id)).fetchone()[0]
+    if guest_id > last_id:
+        raise ValueError("This property has no guest IDs left.")
+    conn.execute("INSERT INTO guests (guest_id, name, phone, email) VALUES (?, ?, ?, ?)", (guest_id, name, phone, email))
+    return guest_id
+
+
+def insert_guest_at(path, first_id, last_id, name, phone, email):
+    use(path)
+    guest_id = hotel_data.hotel_db.immediate(add_guest, first_id, last_id, name, phone, email)
+    hotel_data.hotel_cache.discard(("guest", guest_id))
+    return hotel_data.get_guest(guest_id)
+
+
+def copy_guests(guests):
+    # Guests of other properties, copied here before a booking refers to them
+    guests = [guest for guest in guests if hotel_data.get_guest(guest[0]) is None]
+    if guests:
+        with hotel_data.hotel_db.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO guests VALUES (?, ?, ?, ?)", guests)
+        for guest in guests:
+            hotel_data.hotel_cache.discard(("guest", guest[0]))
+
+
+def book_room_as(path, guest, room_number, check_in_date, check_out_date):
+    use(path)
+    copy_guests([guest])
+    return hotel_data.book_room(room_number, guest[0], check_in_date, check_out_date)
+
+
+def book_rooms_as(path, guests, stays):
+    use(path)
+    copy_guests(guests)
+    return hotel_data.book_rooms(stays)
+
+
+class ShardedHotel:
+    """hotel_data's functions over one database per property, run by a process pool."""
+
+    def __init__(self, properties, workers=None):
+        self.properties = load_properties(properties) if isinstance(properties, str) else properties
+        # spawn: forking a process that already runs Tk and worker threads is unsafe
+        self.pool = ProcessPoolExecutor(workers or os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self):
+        self.pool.shutdown()
+
+    # ----- Routing -----
+    def for_room(self, room_number):
+        room_number = int(room_number)
+        for prop in self.properties:
+            if prop.owns(room_number):
+                return prop
+        raise ValueError(f"Room {room_number} belongs to no property.")
+
+    def for_id(self, record_id, kind):
+        index = (int(record_id) - 1) // ID_BLOCK
+        if not 0 <= index < len(self.properties):
+            raise ValueError(f"{kind} ID not found.")
+        return self.properties[index]
+
+    def call(self, prop, name, *args):
+        return self.pool.submit(run, prop.path, name, *args).result()
+
+    def fan_out(self, name, *args):
+        """hotel_data.name(*args) on every property at once; the results in property order."""
+        futures = [self.pool.submit(run, prop.path, name, *args) for prop in self.properties]
+        return [future.result() for future in futures]
+
+    def only_property(self, props):
+        props = {prop.index: prop for prop in props}
+        if len(props) > 1:
+            raise ValueError(f"{ONE_PROPERTY}; this one has rows of {', '.join(p.name for _, p in sorted(props.items()))}.")
+        return next(iter(props.values()))
+
+    # ----- hotel_data interface -----
+    def init_db(self):
+        futures = [self.pool.submit(init_shard, prop.path, prop.first_id()) for prop in self.properties]
+        for future in futures:
+            future.result()
+
+    def fetch_rooms_page(self, after=None, before=None, limit=PAGE_SIZE):
+        return merged_page(self.fan_out("fetch_rooms_page", after, before, limit), before, limit)
+
+    def fetch_bookings_page(self, after=None, before=None, limit=PAGE_SIZE):
+        return merged_page(self.fan_out("fetch_bookings_page", after, before, limit), before, limit)
+
+    def get_room(self, room_number):
+        return self.call(self.for_room(room_number), "get_room", room_number)
+
+    def get_guest(self, guest_id):
+        try:
+            prop = self.for_id(guest_id, "Guest")
+        except ValueError:
+            return None
+        return self.call(prop, "get_guest", guest_id)
+
+    def insert_room(self, room_number, room_type, price):
+        return self.call(self.for_room(room_number), "insert_room", room_number, room_type, price)
+
+    def remove_room(self, room_number):
+        return self.call(self.for_room(room_number), "remove_room", room_number)
+
+    def insert_guest(self, name, phone, email, property_name=None):
+        """New guests belong to the named property, by default the first one."""
+        prop = next((p for p in self.properties if p.name == property_name), self.properties[0])
+        return self.pool.submit(insert_guest_at, prop.path, prop.first_id(), prop.last_id(), name, phone, email).result()
+
+    def book_room(self, room_number, guest_id, check_in_date, check_out_date):
+        prop = self.for_room(room_number)
+        home = self.for_id(guest_id, "Guest")
+        if home is prop:
+            return self.call(prop, "book_room", room_number, guest_id, check_in_date, check_out_date)
+        guest = self.call(home, "get_guest", guest_id)
+        if guest is None:
+            raise ValueError("Guest ID not found.")
+        return self.pool.submit(book_room_as, prop.path, tuple(guest), room_number, check_in_date, check_out_date).result()
+
+    def cancel_booking(self, room_number, guest_id, check_in_date, check_out_date):
+        return self.call(self.for_room(room_number), "cancel_booking", room_number, guest_id, check_in_date, check_out_date)
+
+    def insert_rooms(self, rooms):
+        rooms = list(rooms)
+        prop = self.only_property(self.for_room(room[0]) for room in rooms)
+        return self.call(prop, "insert_rooms", rooms)
+
+    def import_rooms_job(self, path, task):
+        rooms = self.insert_rooms(read_rooms_csv(path))
+        task.progress(len(rooms))
+        return rooms
+
+    def book_rooms(self, stays):
+        stays = [(int(room), int(guest), check_in, check_out) for room, guest, check_in, check_out in stays]
+        if not stays:
+            raise ValueError("No bookings to create.")
+        prop = self.only_property(self.for_room(stay[0]) for stay in stays)
+        guests = []
+        for guest_id in sorted({stay[1] for stay in stays}):
+            home = self.for_id(guest_id, "Guest")
+            if home is not prop:
+                guest = self.call(home, "get_guest", guest_id)
+                if guest is not None:  # missing guests are reported by book_rooms itself
+                    guests.append(tuple(guest))
+        return self.pool.submit(book_rooms_as, prop.path, guests, stays).result()
+
+    def check_out(self, booking_ids, day=None):
+        booking_ids = sorted({int(booking_id) for booking_id in booking_ids})
+        if not booking_ids:
+            raise ValueError("Please select the bookings to check out.")
+        prop = self.only_property(self.for_id(booking_id, "Booking") for booking_id in booking_ids)
+        return self.call(prop, "check_out", booking_ids, day)
+
+    def find_free_rooms(self, check_in_date, check_out_date, room_type=None):
+        validate_stay(check_in_date, check_out_date)  # a bad date is one error, not one per property
+        return list(heapq.merge(*self.fan_out("find_free_rooms", check_in_date, check_out_date, room_type)))
+
+    def occupancy_report(self, start, end, room_type=None):
+        return merge_reports(self.fan_out("occupancy_report", start, end, room_type))
+
+    def export_table(self, table, path, task):
+        # Streams each property in turn from this process; guests are
+        # exported by their own property only, not as copied elsewhere
+        key = {"rooms": "room_number", "guests": "guest_id", "bookings": "booking_id"}[table]
+        columns, connections, batches = None, [], []
+        try:
+            for prop in self.properties:
+                conn = sqlite3.connect(prop.path)
+                connections.append(conn)
+                where = f"WHERE guest_id BETWEEN {prop.first_id()} AND {prop.last_id()}" if table == "guests" else ""
+                cursor = conn.execute(f"SELECT * FROM {table} {where} ORDER BY {key}")
+                columns = columns or [description[0] for description in cursor.description]
+                batches.append(iter_batches(cursor))
+            return export_batches(columns, itertools.chain(*batches), path, task.progress)
+        finally:
+            for conn in connections:
+                conn.close()
+
+
+def merged_page(pages, before, limit):
+    # Keys are unique across properties, so the page is the first `limit`
+    # rows of the properties' pages merged (descending for `before` pages)
+    return list(itertools.islice(heapq.merge(*pages, reverse=before is not None), limit))
+
+
+def split(source, properties):
+    """Copy rooms, bookings and guests of one hotel.db into the property databases.
+
+    Rooms and their bookings go to the property owning the room number.
+    Guests keep their ids and belong to the first property; the other
+    properties get copies of the guests their bookings name. Booking ids are
+    renumbered into each property's block.
+    """
+    counts = {}
+    with sqlite3.connect(source) as old:
+        rooms = old.execute("SELECT * FROM rooms ORDER BY room_number").fetchall()
+        guests = {row[0]: row for row in old.execute("SELECT * FROM guests")}
+        bookings = old.execute("SELECT * FROM bookings ORDER BY booking_id").fetchall()
+    if guests and max(guests) >= ID_BLOCK:
+        raise ValueError(f"{source} has guest ids beyond {ID_BLOCK}.")
+    owner = {}
+    by_property = defaultdict(lambda: ([], []))
+    for room in rooms:
+        prop = next((p for p in properties if p.owns(room[0])), None)
+        if prop is None:
+            raise ValueError(f"Room {room[0]} belongs to no property.")
+        owner[room[0]] = prop
+        by_property[prop.index][0].append(room)
+    for booking in bookings:
+        if booking[1] in owner:  # bookings of removed rooms stay behind
+            by_property[owner[booking[1]].index][1].append(booking)
+
+    for prop in properties:
+        prop_rooms, prop_bookings = by_property[prop.index]
+        with sqlite3.connect(prop.path) as conn:
+            migrate(conn, HOTEL_MIGRATIONS)
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM rooms UNION ALL SELECT 1 FROM bookings)").fetchone()[0]:
+                raise ValueError(f"{prop.path} already has rooms or bookings.")
+            if prop.index == 0:
+                prop_guests = list(guests.values())
+            else:
+                prop_guests = [guests[n] for n in sorted({b[2] for b in prop_bookings}) if n in guests]
+            conn.executemany("INSERT OR IGNORE INTO guests VALUES (?, ?, ?, ?)", prop_guests)
+            conn.executemany("INSERT INTO rooms VALUES (?, ?, ?, ?)", prop_rooms)
+            offset = prop.index * ID_BLOCK
+            conn.executemany("INSERT INTO bookings VALUES (?, ?, ?, ?, ?)",
+                             [(b[0] + offset, *b[1:]) for b in prop_bookings])
+            rebuild_daily_stats(conn)
+            reserve_ids(conn, prop.first_id())
+        counts[prop.name] = (len(prop_rooms), len(prop_guests), len(prop_bookings))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split hotel.db into property databases, or query them")
+    parser.add_argument("properties", help="properties file, see shards.py")
+    parser.add_argument("--split", metavar="HOTEL_DB", help="copy an existing hotel.db into the property databases")
+    parser.add_argument("--free", nargs=2, metavar=("CHECK_IN", "CHECK_OUT"), help="list the free rooms of every property")
+    parser.add_argument("--room-type")
+    args = parser.parse_args()
+
+    properties = load_properties(args.properties)
+    if args.split:
+        for name, (rooms, guests, bookings) in split(args.split, properties).items():
+            print(f"{name}: {rooms} rooms, {guests} guests, {bookings} bookings")
+    if args.free:
+        hotel = ShardedHotel(properties)
+        try:
+            hotel.init_db()
+            free = hotel.find_free_rooms(*args.free, args.room_type)
+        finally:
+            hotel.close()
+        for room in free:
+            print(f"{hotel.for_room(room[0]).name:<20} {room[0]:>6}  {room[1]:<8} {room[2]:>8.2f}")
+        print(f"{len(free)} free rooms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import time
+
+# ---------- Startup timing ----------
+# Imported first by the apps so the clock starts before any heavy import.
+# The apps call timer.enable() for --startup-report, which prints the
+# breakdown once the first rows are on screen.
+
+_started = time.perf_counter()
+
+
+class StartupTimer:
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = []  # (label, seconds since start)
+        self.enabled = False
+        self.reported = False
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.started))
+
+    def report(self):
+        lines = ["Startup timing:"]
+        previous = 0.0
+        for label, at in self.marks:
+            lines.append(f"  {label:<22} +{(at - previous) * 1000:8.1f} ms  (at {at * 1000:8.1f} ms)")
+            previous = at
+        return "\n".join(lines)
+
+    def finish(self, label="first load"):
+        """Record the final mark and print the report once, if enabled."""
+        if self.reported:
+            return
+        self.mark(label)
+        self.reported = True
+        if self.enabled:
+            print(self.report(), flush=True)
+
+
+timer = StartupTimer(_started)
@@ -0,0 +1,244 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, messagebox
+
+from instrumentation import log_error, profiler
+
+# ---------- Background work for Tk apps ----------
+# Database and file work runs on worker threads; results, errors and progress
+# come back through a queue that the Tk loop drains with root.after(), so
+# widgets are only ever touched from the main thread.
+
+POLL_MS = 20
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class Task:
+    """Handle for a submitted job; long jobs receive it to report progress and see cancellation."""
+
+    def __init__(self, runner, on_progress=None):
+        self.runner = runner
+        self.on_progress = on_progress
+        self.future = None
+        self.submitted = time.perf_counter()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def progress(self, value):
+        """Report progress from the worker; raises TaskCancelled once cancel() was called."""
+        if self.cancelled:
+            raise TaskCancelled()
+        if self.on_progress is not None:
+            self.runner._post(self.on_progress, value)
+
+
+class TaskRunner:
+    def __init__(self, root, job_workers=2, poll_ms=POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        # Database work runs on one thread so writes apply in the order they were clicked
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+        self.job_executor = ThreadPoolExecutor(max_workers=job_workers, thread_name_prefix="job")
+        self._results = queue.SimpleQueue()
+        self._closed = False
+        self._poll()
+
+    def _post(self, callback, value):
+        self._results.put((callback, value))
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    callback, value = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                started = time.perf_counter()
+                # A failing callback must not stop the results queued behind it
+                try:
+                    callback(value)
+                except Exception as e:
+                    log_error(e, "ui apply result")
+                    self.report_error(e)
+                finally:
+                    profiler.record_span("ui apply result", (time.perf_counter() - started) * 1000)
+        finally:
+            if not self._closed:
+                self.root.after(self.poll_ms, self._poll)
+
+    def _run(self, task, fn, args, kwargs, on_done, on_error, on_cancel):
+        # Time in the queue and time running, per function, for the Diagnostics window
+        started = time.perf_counter()
+        name = getattr(fn, "__name__", type(fn).__name__)
+        profiler.record_span("queue wait", (started - task.submitted) * 1000)
+        try:
+            result = fn(*args, **kwargs)
+        except TaskCancelled:
+            if on_cancel is not None:
+                self._post(on_cancel, None)
+        except Exception as e:
+            if not isinstance(e, ValueError):  # ValueErrors are validation messages for the user
+                log_error(e, f"task {name}")
+            self._post(on_error or self.report_error, e)
+        else:
+            if task.cancelled:
+                if on_cancel is not None:
+                    self._post(on_cancel, None)
+            elif on_done is not None:
+                self._post(on_done, result)
+        finally:
+            profiler.record_span(f"task {name}", (time.perf_counter() - started) * 1000)
+
+    def spanned(self, name, task, callback):
+        # callback, then a span from submit until now: what the user waited for.
+        # Callbacks show their dialogs with notify(), so the time a dialog stays
+        # open is not part of the span.
+        def finish(value):
+            try:
+                if callback is not None:
+                    callback(value)
+            finally:
+                profiler.record_span(name, (time.perf_counter() - task.submitted) * 1000)
+        return finish
+
+    def submit(self, fn, *args, on_done=None, on_error=None, span=None, **kwargs):
+        """Run a short database call on the ordered db thread.
+
+        span names a timing from now until on_done (or on_error) has run.
+        """
+        task = Task(self)
+        if span is not None:
+            on_done, on_error = self.spanned(span, task, on_done), self.spanned(span, task, on_error or self.report_error)
+        task.future = self.db_executor.submit(self._run, task, fn, args, kwargs, on_done, on_error, None)
+        return task
+
+    def submit_job(self, fn, *args, on_done=None, on_error=None, on_progress=None, on_cancel=None, span=None, **kwargs):
+        """Run a long job (import/export); fn is called with task=Task for progress and cancellation."""
+        task = Task(self, on_progress)
+        if span is not None:
+            on_done, on_error = self.spanned(span, task, on_done), self.spanned(span, task, on_error or self.report_error)
+        kwargs["task"] = task
+        task.future = self.job_executor.submit(self._run, task, fn, args, kwargs, on_done, on_error, on_cancel)
+        return task
+
+    def submit_with_dialog(self, title, message, fn, *args, on_done=None, on_error=None, span=None):
+        """submit_job() behind a ProgressDialog whose Cancel button cancels the task."""
+        dialog = ProgressDialog(self.root, title, message)
+
+        def finish(result):
+            dialog.close()
+            if on_done is not None:
+                on_done(result)
+
+        def fail(error):
+            dialog.close()
+            (on_error or self.report_error)(error)
+
+        dialog.task = self.submit_job(fn, *args, on_done=finish, on_error=fail,
+                                      on_progress=dialog.update, on_cancel=dialog.close, span=span)
+        return dialog.task
+
+    def notify(self, show, *args, **kwargs):
+        """Call show(*args, **kwargs), e.g. messagebox.showinfo, once the pending results are applied.
+
+        A modal dialog runs its own event loop until it is closed; shown from
+        inside on_done it would hold up the results queued behind it and count
+        its time on screen in the UI spans.
+        """
+        self.root.after_idle(lambda: show(*args, **kwargs))
+
+    def report_error(self, error):
+        self.notify(messagebox.showerror, "Error", f"An unexpected error occurred: {error}")
+
+    def shutdown(self):
+        self._closed = True
+        self.db_executor.shutdown(wait=False, cancel_futures=True)
+        self.job_executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ProgressDialog:
+    """Small modal window with a running count and a Cancel button for a submit_job task."""
+
+    def __init__(self, root, title, message):
+        self.task = None
+        self.message = message
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.resizable(False, False)
+        self.window.transient(root)
+        self.label = tk.Label(self.window, text=message, width=40)
+        self.label.pack(padx=20, pady=(15, 5))
+        self.bar = ttk.Progressbar(self.window, mode="indeterminate", length=280)
+        self.bar.pack(padx=20, pady=5)
+        self.bar.start(15)
+        tk.Button(self.window, text="Cancel", command=self.cancel).pack(pady=(5, 15))
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+
+    def update(self, value):
+        self.label.configure(text=f"{self.message} {value}")
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.close()
+
+    def close(self, *_):
+        if self.window.winfo_exists():
+            self.bar.stop()
+            self.window.destroy()
+
+
+class FrameMonitor:
+    """Measures how late the Tk loop services a fixed-interval timer (frame latency).
+
+    on_frame(latency_ms) is called for every tick, so callers can log or plot it;
+    recent values are kept for max/average reporting.
+    """
+
+    def __init__(self, root, interval_ms=16, on_frame=None, history=300):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.on_frame = on_frame
+        self.latencies = deque(maxlen=history)
+        self._expected = None
+        self._job = None
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._job = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        now = time.perf_counter()
+        latency = max(0.0, (now - self._expected) * 1000)
+        self.latencies.append(latency)
+        if self.on_frame is not None:
+            self.on_frame(latency)
+        self._expected = now + self.interval_ms / 1000
+        self._job = self.root.after(self.interval_ms, self._tick)
+
+    def stats(self):
+        if not self.latencies:
+            return {"frames": 0, "avg_ms": 0.0, "max_ms": 0.0}
+        return {"frames": len(self.latencies),
+                "avg_ms": sum(self.latencies) / len(self.latencies),
+                "max_ms": max(self.latencies)}
@@ -0,0 +1,76 @@
+import asyncio
+import csv
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hotel_data
+import library_data
+from api_client import LibraryClient
+from api_server import ApiServer
+from db import Database
+from tasks import Task
+
+# The API server and LibraryClient against fresh databases in a temporary
+# folder: the server runs its asyncio loop on a thread and listens on a free port.
+#   python -m pytest tests
+
+
+class ApiTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.cwd = os.getcwd()
+        os.chdir(cls.tmp.name)  # the server creates books.db and hotel.db in the working directory
+        cls.saved = library_data.books_db, hotel_data.hotel_db
+        library_data.books_db = Database(os.path.join(cls.tmp.name, "books.db"))
+        hotel_data.hotel_db = Database(os.path.join(cls.tmp.name, "hotel.db"))
+        library_data.books_cache.invalidate()
+        hotel_data.hotel_cache.invalidate()
+
+        started = threading.Event()
+
+        def ready(server):
+            cls.loop, cls.server = asyncio.get_running_loop(), server
+            started.set()
+
+        def serve():
+            try:
+                asyncio.run(ApiServer(read_workers=2).serve("127.0.0.1", 0, ready=ready))
+            except asyncio.CancelledError:
+                pass  # server.close() in tearDownClass
+        cls.thread = threading.Thread(target=serve, daemon=True)
+        cls.thread.start()
+        started.wait(10)
+        port = cls.server.sockets[0].getsockname()[1]
+        cls.library = LibraryClient(f"http://127.0.0.1:{port}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.server.close)
+        cls.thread.join(10)
+        library_data.books_db.close()
+        hotel_data.hotel_db.close()
+        library_data.books_db, hotel_data.hotel_db = cls.saved
+        library_data.books_cache.invalidate()
+        hotel_data.hotel_cache.invalidate()
+        os.chdir(cls.cwd)
+        cls.tmp.cleanup()
+
+    def test_export_more_rows_than_a_server_page(self):
+        # The server returns at most 1000 rows a page; the export asks for FETCH_SIZE
+        rows = [(f"Book {i}", f"Author {i % 50}", 1990 + i % 30, f"978{i:010d}") for i in range(2520)]
+        library_data.insert_many(rows)
+        path = os.path.join(self.tmp.name, "books.csv")
+        self.library.export_job(path, None, Task(None))
+        with open(path, newline="", encoding="utf-8") as f:
+            exported = list(csv.reader(f))[1:]
+        self.assertEqual(len(exported), 2520)
+        self.assertEqual(len({row[0] for row in exported}), 2520)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hotel_data
+from db import Database
+
+# hotel_data against a fresh hotel.db in a temporary folder.
+
+
+class HotelDataTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = hotel_data.hotel_db
+        hotel_data.hotel_db = Database(os.path.join(self.tmp.name, "hotel.db"))
+        hotel_data.hotel_cache.invalidate()
+        hotel_data.init_db()
+        hotel_data.insert_room(101, "Single", 80)
+        self.guest_id = hotel_data.insert_guest("Guest", "555-0101", "guest@example.com")[0]
+
+    def tearDown(self):
+        hotel_data.hotel_db.close()
+        hotel_data.hotel_db = self.saved
+        hotel_data.hotel_cache.invalidate()
+        self.tmp.cleanup()
+
+    def test_cancel_with_the_dates_the_booking_was_made_with(self):
+        booking, _ = hotel_data.book_room(101, self.guest_id, "2030-1-5", "2030-1-8")
+        self.assertEqual(booking[3:], ("2030-01-05", "2030-01-08"))
+        booking_ids, _ = hotel_data.cancel_booking(101, self.guest_id, "2030-1-5", "2030-1-8")
+        self.assertEqual(booking_ids, [booking[0]])
+        self.assertEqual(hotel_data.fetch_bookings_page(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
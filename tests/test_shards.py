@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shards import ID_BLOCK, ShardedHotel
+
+# ShardedHotel over two fresh property databases in a temporary folder.
+
+
+class ShardedHotelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.tmp.name, "properties.json")
+        with open(path, "w") as f:
+            json.dump({"properties": [{"name": "Harbour", "db": "harbour.db", "rooms": [100, 199]},
+                                      {"name": "Hilltop", "db": "hilltop.db", "rooms": [200, 299]}]}, f)
+        cls.hotel = ShardedHotel(path, workers=2)
+        cls.hotel.init_db()
+        cls.hotel.insert_room(101, "Single", 80)
+        cls.hotel.insert_room(201, "Double", 120)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.hotel.close()
+        cls.tmp.cleanup()
+
+    def test_new_guest_stays_in_its_block_after_a_cross_property_booking(self):
+        harbour, hilltop = self.hotel.properties
+        visitor = self.hotel.insert_guest("Visitor", "555-0101", "visitor@example.com", "Hilltop")
+        self.assertIs(self.hotel.for_id(visitor[0], "Guest"), hilltop)
+        # A Hilltop guest books at Harbour, which copies the guest row there with its Hilltop id
+        self.hotel.book_room(101, visitor[0], "2030-01-05", "2030-01-08")
+
+        local = self.hotel.insert_guest("Local", "555-0102", "local@example.com", "Harbour")
+        self.assertLess(local[0], ID_BLOCK)
+        self.assertIs(self.hotel.for_id(local[0], "Guest"), harbour)
+        self.assertEqual(self.hotel.get_guest(local[0]), local)
+        self.assertEqual(self.hotel.get_guest(visitor[0]), visitor)
+
+
+if __name__ == "__main__":
+    unittest.main()